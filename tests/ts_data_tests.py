@@ -0,0 +1,197 @@
+"""
+Unit tests for data preparation
+
+"""
+
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from tradingsystemsdata import utils
+from tradingsystemsdata.marketdata import Markets
+from tradingsystemsdata.utils import Reformat, Setup
+
+
+def _cache_params(**kwargs) -> dict:
+    """
+    Return the parameters used to key the price cache.
+
+    """
+    return {'start_date':'2020-01-01',
+            'end_date':'2020-12-31',
+            'asset_type':'equity',
+            'ccy_1':'USD',
+            'ccy_2':'USD',
+            **kwargs}
+
+
+def _fake_base_data(ticker, source, params, benchmark_flag=False):
+    """
+    Stand in for the price download, setting the longname as Yahoo does.
+
+    """
+    params['longname'] = ticker + ' Inc'
+    prices = pd.DataFrame(
+        {'Close':np.arange(5.0)},
+        index=pd.bdate_range(params['start_date'], periods=5))
+
+    return prices, params
+
+
+class TradingSystemDataTestCase(unittest.TestCase):
+    """
+    Unit tests for data preparation
+
+    """
+
+    def test_trim_dates(self):
+        """
+        Unit test for trimming price history to the backtest dates.
+
+        Returns
+        -------
+        Pass / Fail.
+
+        """
+        print("Unit test for trim dates")
+
+        index = pd.bdate_range('2020-01-01', periods=100)
+        prices = pd.DataFrame({'Close':np.arange(100.0)}, index=index)
+
+        # Matches label slicing, including dates that aren't trading days
+        for start_date, end_date in [('2020-01-06', '2020-02-14'),
+                                     ('2020-01-04', '2020-02-16'),
+                                     (None, '2020-03-01'),
+                                     ('2020-03-01', None),
+                                     (None, None)]:
+            trimmed = Markets.trim_dates(
+                prices=prices, start_date=start_date, end_date=end_date)
+            pd.testing.assert_frame_equal(
+                trimmed, prices.loc[start_date:end_date])
+
+        # Unsorted data is sorted before trimming
+        trimmed = Markets.trim_dates(
+            prices=prices.iloc[::-1], start_date='2020-01-06',
+            end_date='2020-02-14')
+        pd.testing.assert_frame_equal(
+            trimmed, prices.loc['2020-01-06':'2020-02-14'])
+
+
+    def test_add_columns(self):
+        """
+        Unit test for adding a dictionary of arrays to the OHLC data.
+
+        Returns
+        -------
+        Pass / Fail.
+
+        """
+        print("Unit test for add columns")
+
+        index = pd.bdate_range('2020-01-01', periods=5)
+        prices = pd.DataFrame({'Close':np.arange(5.0),
+                               'pnl':np.zeros(5)}, index=index)
+
+        result = Reformat.add_columns(
+            prices=prices,
+            column_dict={'pnl':np.ones(5), 'equity':np.arange(5) * 2})
+
+        self.assertEqual(list(result.columns), ['Close', 'pnl', 'equity'])
+        np.testing.assert_array_equal(result['pnl'], np.ones(5))
+        np.testing.assert_array_equal(result['equity'], np.arange(5) * 2)
+        self.assertTrue(result.index.equals(index))
+
+        # Existing columns are overwritten on the frame passed in
+        np.testing.assert_array_equal(prices['pnl'], np.ones(5))
+
+
+    def test_cached_base_data(self):
+        """
+        Unit test for reusing downloaded prices from the price cache.
+
+        Returns
+        -------
+        Pass / Fail.
+
+        """
+        print("Unit test for the price cache")
+
+        Setup.clear_price_cache()
+        self.addCleanup(Setup.clear_price_cache)
+
+        with mock.patch.object(
+                Markets, 'create_base_data',
+                side_effect=_fake_base_data) as download:
+            prices, params = Setup.cached_base_data(
+                ticker='AAA', source='yahoo', params=_cache_params(),
+                benchmark_flag=False)
+
+            # Changing the returned data doesn't change the cached copy
+            prices['Close'] = 0.0
+            cached, cached_params = Setup.cached_base_data(
+                ticker='AAA', source='yahoo',
+                params=_cache_params(entry_type='2ma'), benchmark_flag=False)
+            self.assertEqual(download.call_count, 1)
+            np.testing.assert_array_equal(cached['Close'], np.arange(5.0))
+
+            # The parameters set by the download are replayed without
+            # losing the others
+            self.assertEqual(params['longname'], 'AAA Inc')
+            self.assertEqual(cached_params, {**params, 'entry_type':'2ma'})
+
+            # Each part of the key is downloaded separately
+            for ticker, source, key_params, benchmark_flag in [
+                    ('BBB', 'yahoo', _cache_params(), False),
+                    ('AAA', 'norgate', _cache_params(), False),
+                    ('AAA', 'yahoo', _cache_params(), True),
+                    ('AAA', 'yahoo', _cache_params(end_date='2021-12-31'),
+                     False),
+                    ('AAA', 'yahoo', _cache_params(ccy_2='EUR'), False)]:
+                Setup.cached_base_data(
+                    ticker=ticker, source=source, params=key_params,
+                    benchmark_flag=benchmark_flag)
+            self.assertEqual(download.call_count, 6)
+
+
+    def test_price_cache_eviction(self):
+        """
+        Unit test for discarding the least recently used prices when the
+        price cache is full.
+
+        Returns
+        -------
+        Pass / Fail.
+
+        """
+        print("Unit test for price cache eviction")
+
+        Setup.clear_price_cache()
+        self.addCleanup(Setup.clear_price_cache)
+
+        def fetch(ticker):
+            Setup.cached_base_data(
+                ticker=ticker, source='yahoo', params=_cache_params(),
+                benchmark_flag=False)
+
+        with mock.patch.object(utils, '_PRICE_CACHE_SIZE', 2), \
+                mock.patch.object(
+                    Markets, 'create_base_data',
+                    side_effect=_fake_base_data) as download:
+            fetch('AAA')
+            fetch('BBB')
+
+            # Using AAA again makes BBB the least recently used
+            fetch('AAA')
+            fetch('CCC')
+            self.assertEqual(download.call_count, 3)
+
+            fetch('AAA')
+            self.assertEqual(download.call_count, 3)
+            fetch('BBB')
+            self.assertEqual(download.call_count, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,215 @@
+"""
+Unit tests for the compiled kernels
+
+"""
+
+import types
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from tradingsystemsdata import _njit
+from tradingsystemsdata.pnl import _profit_loop
+from tradingsystemsdata.positions import Positions
+from tradingsystemsdata.trades import Trades
+from tradingsystemsdata.utils import Reformat
+
+
+def _random_positions(periods: int, seed: int) -> tuple[dict, np.ndarray]:
+    """
+    Create the raw positions of random long, short and flat periods, and a
+    random position size.
+
+    """
+    rng = np.random.default_rng(seed)
+    target = np.repeat(rng.choice([-1.0, 0.0, 1.0], periods), 3)[:periods]
+    target[0] = 0
+    signal = np.append(np.diff(target), 0)
+    prices = pd.DataFrame(index=pd.bdate_range('2020-01-01', periods=periods))
+    pos_dict = Positions.calc_positions(prices=prices, signal=signal, start=1)
+    position_size = rng.integers(1, 500, periods).astype(float)
+
+    return pos_dict, position_size
+
+
+class TradingSystemKernelTestCase(unittest.TestCase):
+    """
+    Unit tests for the compiled kernels
+
+    """
+
+    def test_kernel_prefers_compiled(self):
+        """
+        Unit test for using the ahead of time compiled kernel when built.
+
+        Returns
+        -------
+        Pass / Fail.
+
+        """
+        print("Unit test for ahead of time compiled kernels")
+
+        def _test_kernel_loop(value):
+            return value + 1
+
+        def compiled(value):
+            return value + 1
+
+        compiled_module = types.SimpleNamespace(_test_kernel_loop=compiled)
+        with mock.patch.object(_njit, '_compiled_kernels', compiled_module), \
+                mock.patch.object(_njit, 'njit') as njit:
+            result = _njit.kernel('i8(i8)')(_test_kernel_loop)
+
+        self.assertIs(result, compiled)
+        njit.assert_not_called()
+        self.assertIs(
+            _njit.KERNELS.pop('_test_kernel_loop')[0], _test_kernel_loop)
+
+
+    def test_kernel_falls_back_to_jit(self):
+        """
+        Unit test for JIT compiling a kernel that hasn't been built.
+
+        Returns
+        -------
+        Pass / Fail.
+
+        """
+        print("Unit test for JIT compiled kernels")
+
+        def _test_kernel_loop(value):
+            return value + 1
+
+        with mock.patch.object(_njit, '_compiled_kernels', None), \
+                mock.patch.object(_njit, 'njit') as njit:
+            result = _njit.kernel('i8(i8)')(_test_kernel_loop)
+
+        _njit.KERNELS.pop('_test_kernel_loop')
+        njit.assert_called_once_with('i8(i8)', cache=True)
+        njit.return_value.assert_called_once_with(_test_kernel_loop)
+        self.assertIs(result, njit.return_value.return_value)
+
+
+    def test_length_checked(self):
+        """
+        Unit test for rejecting position data that doesn't match the prices.
+
+        Returns
+        -------
+        Pass / Fail.
+
+        """
+        print("Unit test for position data length")
+
+        index = pd.bdate_range('2020-01-01', periods=5)
+        prices = pd.DataFrame({'Close':np.arange(5.0)}, index=index)
+
+        with self.assertRaises(ValueError):
+            Positions.calc_positions(
+                prices=prices, signal=np.zeros(4), start=1)
+        with self.assertRaises(ValueError):
+            Trades.trade_numbers(
+                prices=prices, end_of_day_position=np.zeros(6), start=1)
+
+        pos_dict = Positions.calc_positions(
+            prices=prices, signal=np.array([0, 1, 1, -1, 0.0]), start=1)
+        trade_number = Trades.trade_numbers(
+            prices=prices,
+            end_of_day_position=pos_dict['end_of_day_position'], start=1)
+        self.assertEqual(len(trade_number), len(prices))
+
+
+    def test_scale_map_tradenum_matches_reference(self):
+        """
+        Unit test for scaling positions and numbering trades in one pass,
+        against scaling the positions and then numbering the trades.
+
+        Returns
+        -------
+        Pass / Fail.
+
+        """
+        print("Unit test for scaled positions and trade numbers")
+
+        for seed in range(5):
+            pos_dict, position_size = _random_positions(
+                periods=300, seed=seed)
+            prices = pd.DataFrame(index=np.arange(300))
+            scaled = Reformat.position_scale(
+                pos_dict=pos_dict, position_size=position_size)
+
+            for start in (0, 1, 2, 10, 150):
+                result = Trades.scale_positions_and_number_trades(
+                    pos_dict=pos_dict, position_size=position_size,
+                    start=start)
+                for key, value in scaled.items():
+                    np.testing.assert_array_equal(result[key], value)
+                np.testing.assert_array_equal(
+                    result['trade_number'], Trades.trade_numbers(
+                        prices=prices,
+                        end_of_day_position=scaled['end_of_day_position'],
+                        start=start))
+
+
+    def test_profit_loop_matches_reference(self):
+        """
+        Unit test for the daily pnl kernel against the pnl of each case of
+        position change calculated over the whole array.
+
+        Returns
+        -------
+        Pass / Fail.
+
+        """
+        print("Unit test for daily pnl")
+
+        slippage, commission, contract_point_value = 5.0, 1.5, 50.0
+
+        def trade_pnl(pos, price_from, price_to, open_):
+            # Pnl of a position between two prices, less trading costs
+            return ((pos * (price_to - price_from)
+                     - np.abs(pos * slippage * 0.0001 * open_))
+                    - commission) * contract_point_value
+
+        for seed in range(5):
+            rng = np.random.default_rng(seed)
+            pos_dict, position_size = _random_positions(
+                periods=300, seed=seed)
+            pos = Reformat.position_scale(
+                pos_dict=pos_dict,
+                position_size=position_size)['end_of_day_position'].astype(
+                    float)
+            close = 100 + np.cumsum(rng.normal(0, 1, 300))
+            open_ = close + rng.normal(0, 0.5, 300)
+
+            day_pnl, last_day_trade_pnl = _profit_loop(
+                open_, close, pos, slippage, commission, contract_point_value)
+
+            prev_pos, prev_close = pos[:-1], close[:-1]
+            today_pos, today_open = pos[1:], open_[1:]
+            closed = (today_pos == 0) & (prev_pos != 0)
+            held = today_pos * prev_pos > 0
+            reversed_ = today_pos * prev_pos < 0
+            opened = (today_pos != 0) & (prev_pos == 0)
+
+            expected = np.zeros(300)
+            expected[1:] = np.select(
+                [closed, held, reversed_ | opened],
+                [trade_pnl(prev_pos, prev_close, today_open, today_open),
+                 today_pos * (close[1:] - prev_close) * contract_point_value,
+                 trade_pnl(today_pos, today_open, close[1:], today_open)])
+            expected_last = np.zeros(300)
+            expected_last[1:] = np.where(
+                reversed_,
+                trade_pnl(prev_pos, prev_close, today_open, today_open), 0)
+
+            np.testing.assert_allclose(day_pnl, expected, rtol=1e-12)
+            np.testing.assert_allclose(
+                last_day_trade_pnl, expected_last, rtol=1e-12)
+            self.assertTrue(reversed_.any() and closed.any())
+
+
+if __name__ == '__main__':
+    unittest.main()
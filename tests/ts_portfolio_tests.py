@@ -0,0 +1,346 @@
+"""
+Unit tests for portfolio backtests
+
+"""
+
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from tradingsystemsdata import systems
+from tradingsystemsdata.marketdata import Markets, NorgateFunctions
+from tradingsystemsdata.systems import (
+    TestPortfolio, TestStrategy, clear_caches)
+
+
+def _synthetic_prices(periods: int = 900, seed: int = 0) -> pd.DataFrame:
+    """
+    Create a DataFrame of random walk OHLC data ending today.
+
+    """
+    index = pd.bdate_range(
+        end=pd.Timestamp.today().normalize(), periods=periods)
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, periods))
+
+    return pd.DataFrame({'Open':close,
+                         'High':close + 1,
+                         'Low':close - 1,
+                         'Close':close,
+                         'Volume':1e6}, index=index)
+
+
+def _fake_base_data(ticker, source, params, benchmark_flag=False):
+    """
+    Stand in for the price download, setting the longname as Yahoo does.
+
+    """
+    if benchmark_flag:
+        params['benchmark_longname'] = ticker
+    else:
+        params['longname'] = ticker
+
+    return _synthetic_prices(seed=1), params
+
+
+class TradingSystemPortfolioTestCase(unittest.TestCase):
+    """
+    Unit tests for portfolio backtests
+
+    """
+
+    def setUp(self):
+        clear_caches()
+        patches = [
+            mock.patch.object(
+                Markets, 'create_base_data', side_effect=_fake_base_data),
+            mock.patch.object(
+                NorgateFunctions, 'return_norgate_data',
+                return_value=_synthetic_prices(seed=2))]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.addCleanup(clear_caches)
+
+
+    def test_vectorized_equities(self):
+        """
+        Unit test for the vectorized portfolio with yahoo equities.
+
+        Returns
+        -------
+        Pass / Fail.
+
+        """
+        print("Unit test for vectorized portfolio with equities")
+
+        portfolio = {'equities':{'AAA':_synthetic_prices(seed=3),
+                                 'BBB':_synthetic_prices(seed=4)}}
+
+        system_dict = TestPortfolio.run_individual_tests_vectorized(
+            portfolio, entry_type='2ma', verbose=False)
+
+        self.assertEqual(sorted(system_dict), ['AAA', 'BBB', 'benchmark'])
+        for ticker in ('AAA', 'BBB'):
+            ticker_dict = system_dict[ticker]
+            self.assertEqual(ticker_dict['params']['ticker_source'], 'yahoo')
+            self.assertEqual(ticker_dict['params']['longname'], ticker)
+            self.assertGreater(len(ticker_dict['prices']), 0)
+            self.assertGreater(len(ticker_dict['monthly_data']), 0)
+
+
+    def test_portfolio_entry_storage(self):
+        """
+        Unit test for the data stored for each ticker in a portfolio.
+
+        Returns
+        -------
+        Pass / Fail.
+
+        """
+        print("Unit test for portfolio entry storage")
+
+        portfolio = {'fx':{'AAA':_synthetic_prices(seed=3)}}
+
+        system_dict = TestPortfolio.run_individual_tests_vectorized(
+            portfolio, market_data=_synthetic_prices(seed=5), verbose=False)
+
+        ticker_dict = system_dict['AAA']
+        prices = ticker_dict['prices']
+        self.assertEqual(prices['Close'].dtype, np.float32)
+        self.assertEqual(prices['daily_pnl'].dtype, np.float32)
+        self.assertEqual(prices['mtm_equity'].dtype, np.float64)
+        self.assertEqual(prices['cumulative_trade_pnl'].dtype, np.float64)
+        self.assertNotIn('market_data', ticker_dict['params'])
+        for value in ticker_dict['params'].values():
+            self.assertNotIsInstance(value, (pd.DataFrame, pd.Series))
+
+
+    def test_lazy_signals(self):
+        """
+        Unit test for generating the signal data on first access of params.
+
+        Returns
+        -------
+        Pass / Fail.
+
+        """
+        print("Unit test for lazy signal generation")
+
+        strat_kwargs = {'ticker':'AAA',
+                        'ticker_source':'yahoo',
+                        'input_data':'set',
+                        'entry_type':'2ma'}
+
+        eager = TestStrategy(
+            tables={'prices':_synthetic_prices(seed=3)}, **strat_kwargs)
+        lazy = TestStrategy(
+            tables={'prices':_synthetic_prices(seed=3)},
+            generate_signals=False, **strat_kwargs)
+
+        self.assertNotIn('params', lazy.__dict__)
+        self.assertNotIn('signal_dict', lazy.backtest_params)
+
+        # Reading params generates the signals without changing the tables
+        prices = lazy.tables['prices']
+        self.assertIn('signal_dict', lazy.params)
+        self.assertIs(lazy.tables['prices'], prices)
+        self.assertTrue(prices.isna().any().any())
+        self.assertEqual(sorted(lazy.params), sorted(eager.params))
+
+        # Portfolio entries are back filled as for an eager strategy
+        system_dict = TestPortfolio.run_individual_tests_vectorized(
+            {'equities':{'AAA':_synthetic_prices(seed=3)}},
+            entry_type='2ma', keep_columns=None, verbose=False)
+        stored = system_dict['AAA']['prices']
+        self.assertFalse(stored.isna().any().any())
+        pd.testing.assert_series_equal(
+            stored['mtm_equity'], eager.tables['prices']['mtm_equity'])
+
+
+    def test_portfolio_with_data(self):
+        """
+        Unit test for the default portfolio backtest of each ticker.
+
+        Returns
+        -------
+        Pass / Fail.
+
+        """
+        print("Unit test for portfolio with data")
+
+        portfolio = {'equities':{'AAA':_synthetic_prices(seed=3),
+                                 'BBB':_synthetic_prices(seed=4)},
+                     'fx':{'CCC':_synthetic_prices(seed=5)}}
+
+        system_dict = TestPortfolio.run_individual_tests_with_data(
+            portfolio, entry_type='2ma', parallel=False, verbose=False)
+
+        self.assertEqual(
+            sorted(system_dict), ['AAA', 'BBB', 'CCC', 'benchmark'])
+        pd.testing.assert_frame_equal(
+            system_dict['benchmark'], _synthetic_prices(seed=2))
+        for ticker, source in (('AAA', 'yahoo'),
+                               ('BBB', 'yahoo'),
+                               ('CCC', 'alpha')):
+            ticker_dict = system_dict[ticker]
+            params = ticker_dict['params']
+            self.assertEqual(ticker_dict['inputs'], {
+                'ticker':ticker,
+                'ticker_source':source,
+                'entry_type':'2ma',
+                'start_date':params['start_date'],
+                'end_date':params['end_date']})
+            self.assertGreater(len(ticker_dict['prices']), 0)
+            self.assertGreater(len(ticker_dict['monthly_data']), 0)
+
+        # The benchmark is downloaded for the supplied dates
+        with mock.patch.object(
+                NorgateFunctions, 'return_norgate_data',
+                return_value=_synthetic_prices(seed=2)) as benchmark:
+            TestPortfolio.run_individual_tests_with_data(
+                portfolio, start_date='2022-01-03', end_date='2023-01-03',
+                parallel=False, verbose=False)
+
+        benchmark.assert_called_once_with(
+            '$SPX', {'start_date':'2022-01-03', 'end_date':'2023-01-03'})
+
+
+    def test_lazy_perf_reports(self):
+        """
+        Unit test for creating the performance data after a portfolio run.
+
+        Returns
+        -------
+        Pass / Fail.
+
+        """
+        print("Unit test for lazy performance reports")
+
+        inputs = {'ticker_source':'yahoo',
+                  'input_data':'set',
+                  'entry_type':'2ma'}
+        system_dict = {
+            'AAA':{'inputs':{
+                'ticker':'AAA',
+                'tables':{'prices':_synthetic_prices(seed=3)}, **inputs}},
+            'BBB':{'inputs':{
+                'ticker':'BBB',
+                'tables':{'prices':_synthetic_prices(seed=4)}, **inputs}},
+            'CCC':{'perf_dict':{}},
+            'benchmark':_synthetic_prices(seed=1)}
+
+        # Rerun the backtests in this process so that the downloads are
+        # patched
+        TestPortfolio.compute_perf_reports_lazy(system_dict, parallel=False)
+
+        for ticker, seed in (('AAA', 3), ('BBB', 4)):
+            _, tables, _, _ = TestStrategy.run_backtest(
+                ticker=ticker, tables={'prices':_synthetic_prices(seed=seed)},
+                **inputs)
+            perf_dict = system_dict[ticker]['perf_dict']
+            self.assertEqual(perf_dict.keys(), tables['perf_dict'].keys())
+            self.assertEqual(
+                perf_dict['net_pnl'], tables['perf_dict']['net_pnl'])
+        self.assertEqual(system_dict['CCC']['perf_dict'], {})
+
+        # The stored inputs fix the dates used by the portfolio run
+        system_dict = TestPortfolio.run_individual_tests_with_data(
+            {'equities':{'AAA':None}}, entry_type='2ma', verbose=False)
+        ticker_dict = system_dict['AAA']
+        for key in ('start_date', 'end_date'):
+            self.assertEqual(
+                ticker_dict['inputs'][key], ticker_dict['params'][key])
+
+        TestPortfolio.compute_perf_reports_lazy(system_dict)
+        self.assertIn('perf_dict', ticker_dict)
+
+
+    def test_fp32_prices(self):
+        """
+        Unit test for storing the OHLC data in single precision on request.
+
+        Returns
+        -------
+        Pass / Fail.
+
+        """
+        print("Unit test for single precision prices")
+
+        inputs = {'ticker':'AAA',
+                  'ticker_source':'yahoo',
+                  'input_data':'set',
+                  'entry_type':'channel_breakout',
+                  'position_type':'atr'}
+
+        _, default, _, _ = TestStrategy.run_backtest(
+            tables={'prices':_synthetic_prices(seed=3)}, **inputs)
+        _, single, _, _ = TestStrategy.run_backtest(
+            tables={'prices':_synthetic_prices(seed=3)}, fp32=True, **inputs)
+
+        # Prices stay in double precision unless fp32 is set
+        self.assertEqual(default['prices']['Close'].dtype, np.float64)
+        self.assertEqual(single['prices']['Close'].dtype, np.float32)
+        self.assertEqual(single['prices']['mtm_equity'].dtype, np.float64)
+
+
+    def test_pool_lifecycle(self):
+        """
+        Unit test for reusing and restarting the pool of worker processes.
+
+        Returns
+        -------
+        Pass / Fail.
+
+        """
+        print("Unit test for the worker pool")
+
+        with mock.patch('atexit.register') as register, \
+                mock.patch.object(systems, '_POOL_EXIT_REGISTERED', False):
+            pool = TestPortfolio.get_pool()
+            self.assertIs(TestPortfolio.get_pool(), pool)
+            self.assertEqual(pool.submit(abs, -1).result(), 1)
+
+            # A new pool is started after a shutdown
+            TestPortfolio.shutdown_pool()
+            restarted = TestPortfolio.get_pool()
+            self.assertIsNot(restarted, pool)
+
+            # Clearing the caches also clears them in the workers
+            clear_caches()
+            self.assertIsNot(TestPortfolio.get_pool(), restarted)
+
+        # The shutdown is only registered to run on exit once
+        register.assert_called_once_with(TestPortfolio.shutdown_pool)
+
+
+    def test_serial_portfolio(self):
+        """
+        Unit test for running a portfolio without the worker processes.
+
+        Returns
+        -------
+        Pass / Fail.
+
+        """
+        print("Unit test for serial portfolio")
+
+        with mock.patch.object(TestPortfolio, 'get_pool') as get_pool:
+            # A single ticker is run in this process
+            single = TestPortfolio.run_individual_tests_with_data(
+                {'equities':{'AAA':None}}, verbose=False)
+
+            # As is any portfolio that isn't run in parallel
+            serial = TestPortfolio.run_individual_tests_with_data(
+                {'equities':{'AAA':None, 'BBB':None}}, parallel=False,
+                verbose=False)
+
+        get_pool.assert_not_called()
+        self.assertEqual(sorted(single), ['AAA', 'benchmark'])
+        self.assertEqual(sorted(serial), ['AAA', 'BBB', 'benchmark'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+"""
+Ahead of time compile the Numba kernels into the _compiled_kernels
+extension module so that the first backtest in a session doesn't pay the
+JIT compilation cost. Requires Numba and a C compiler. Run with:
+
+    python -m tradingsystemsdata._build_kernels
+
+"""
+import os
+
+from numba.pycc import CC
+
+# Importing the modules registers their kernels
+from tradingsystemsdata import pnl, positions, trades # pylint: disable=unused-import
+from tradingsystemsdata._njit import KERNELS
+
+
+def build_kernels(output_dir: str | None = None) -> None:
+    """
+    Compile each registered kernel with its signature into a single
+    extension module.
+
+    Parameters
+    ----------
+    output_dir : Str, optional
+        The directory to write the extension module to. The default is the
+        tradingsystemsdata package directory.
+
+    Returns
+    -------
+    None.
+
+    """
+    if output_dir is None:
+        output_dir = os.path.dirname(os.path.abspath(__file__))
+
+    compiler = CC('_compiled_kernels')
+    compiler.output_dir = output_dir
+
+    for name, (func, signature) in KERNELS.items():
+        compiler.export(name, signature)(func)
+
+    compiler.compile()
+
+
+if __name__ == '__main__':
+    build_kernels()
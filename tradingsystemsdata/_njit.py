@@ -0,0 +1,63 @@
+"""
+Optional Numba JIT compilation of the row by row loops
+
+"""
+try:
+    from numba import njit
+
+except ImportError:
+
+    def njit(*args, **kwargs):
+        """
+        No-op replacement for numba.njit used when Numba is not installed.
+        Supports both the bare @njit and the @njit(signature, ...) forms.
+
+        """
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+
+        return decorator
+
+# Kernels built ahead of time by tradingsystemsdata._build_kernels
+try:
+    from tradingsystemsdata import _compiled_kernels
+except ImportError:
+    _compiled_kernels = None
+
+# Python versions of the kernels and their signatures, used to build the
+# ahead of time compiled module
+KERNELS = {}
+
+
+def kernel(signature: str):
+    """
+    Return the ahead of time compiled version of a kernel if it has been
+    built, otherwise JIT compile it for the given signature. The Python
+    version is registered for ahead of time compilation either way.
+
+    Parameters
+    ----------
+    signature : Str
+        The Numba signature of the kernel.
+
+    Returns
+    -------
+    decorator : Function
+        Decorator returning the compiled kernel.
+
+    """
+    def decorator(func):
+        KERNELS[func.__name__] = (func, signature)
+
+        # Only JIT compile if there is no ahead of time compiled version, as
+        # compiling with a signature happens when the module is imported
+        compiled = getattr(_compiled_kernels, func.__name__, None)
+        if compiled is not None:
+            return compiled
+
+        return njit(signature, cache=True)(func)
+
+    return decorator
@@ -12,6 +12,35 @@ class MovingAverageEntry():
     Functions to create moving average crossover trading signals
 
     """
+    @staticmethod
+    def simple_ma(
+        prices: pd.DataFrame,
+        time_period: int) -> np.ndarray:
+        """
+        Simple moving average of the closing prices. If an 'sma_<period>'
+        column has already been calculated, e.g. across a whole portfolio,
+        this is used rather than recalculating it.
+
+        Parameters
+        ----------
+        prices : DataFrame
+            The OHLC data
+        time_period : Int
+            The number of days in the moving average.
+
+        Returns
+        -------
+        simple_ma : Array
+            The simple moving average.
+
+        """
+        column = 'sma_' + str(time_period)
+        if column in prices.columns:
+            return np.array(prices[column])
+
+        return np.array(prices['Close'].rolling(time_period).mean())
+
+
     @staticmethod
     def entry_double_ma_crossover(
         prices: pd.DataFrame,
@@ -50,8 +79,10 @@ class MovingAverageEntry():
         if simple_ma:
 
             # Create short and long simple moving averages
-            ma_1 = np.array(prices['Close'].rolling(ma1).mean())
-            ma_2 = np.array(prices['Close'].rolling(ma2).mean())
+            ma_1 = MovingAverageEntry.simple_ma(
+                prices=prices, time_period=ma1)
+            ma_2 = MovingAverageEntry.simple_ma(
+                prices=prices, time_period=ma2)
 
         else:
             # Create short and long exponential moving averages
@@ -152,9 +183,12 @@ class MovingAverageEntry():
 
         # Create fast, medium and slow simple moving averages
         if simple_ma:
-            ma_1 = np.array(prices['Close'].rolling(ma1).mean())
-            ma_2 = np.array(prices['Close'].rolling(ma2).mean())
-            ma_3 = np.array(prices['Close'].rolling(ma3).mean())
+            ma_1 = MovingAverageEntry.simple_ma(
+                prices=prices, time_period=ma1)
+            ma_2 = MovingAverageEntry.simple_ma(
+                prices=prices, time_period=ma2)
+            ma_3 = MovingAverageEntry.simple_ma(
+                prices=prices, time_period=ma3)
 
         else:
             ma_1 = Indicators.EMA(
@@ -269,10 +303,14 @@ class MovingAverageEntry():
 
         # Create the 4 simple moving averages
         if simple_ma:
-            ma_1 = np.array(prices['Close'].rolling(ma1).mean())
-            ma_2 = np.array(prices['Close'].rolling(ma2).mean())
-            ma_3 = np.array(prices['Close'].rolling(ma3).mean())
-            ma_4 = np.array(prices['Close'].rolling(ma4).mean())
+            ma_1 = MovingAverageEntry.simple_ma(
+                prices=prices, time_period=ma1)
+            ma_2 = MovingAverageEntry.simple_ma(
+                prices=prices, time_period=ma2)
+            ma_3 = MovingAverageEntry.simple_ma(
+                prices=prices, time_period=ma3)
+            ma_4 = MovingAverageEntry.simple_ma(
+                prices=prices, time_period=ma4)
 
         else:
             ma_1 = Indicators.EMA(
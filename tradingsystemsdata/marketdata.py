@@ -287,31 +287,10 @@ class Markets():
         # Sort data in ascending order
         prices = prices[::-1]
 
-        # If a start date has been provided
-        if params['start_date'] is not None:
-
-            # Set the start variable to this, converting to datetime format
-            start = pd.to_datetime(params['start_date'])
-
-        # If no start date is provided
-        else:
-            # Set the start variable to the first row in the DataFrame
-            start = prices.index[0]
-
-        # If an end date has been provided
-        if params['end_date'] is not None:
-
-            # Set the end variable to this, converting to datetime format
-            end = pd.to_datetime(params['end_date'])
-
-        # If no end date is provided
-        else:
-
-            # Set the end variable to the last row in the DataFrame
-            end = prices.index[-1]
-
         # Trim data to specified dates
-        prices = prices.loc[start:end]
+        prices = cls.trim_dates(
+            prices=prices, start_date=params['start_date'],
+            end_date=params['end_date'])
 
         try:
             prices.index = prices.index.tz_localize(None) #type: ignore
@@ -326,6 +305,54 @@ class Markets():
         return prices
 
 
+    @staticmethod
+    def trim_dates(
+        prices: pd.DataFrame,
+        start_date: str | None,
+        end_date: str | None) -> pd.DataFrame:
+        """
+        Trim a DataFrame of historic prices to the specified dates using a
+        binary search on the date index rather than a boolean mask.
+
+        Parameters
+        ----------
+        prices : DataFrame
+            DataFrame of historic prices with a DatetimeIndex.
+        start_date : Str
+            Date to begin backtest. Format is 'YYYY-MM-DD'. If None, start
+            from the first row.
+        end_date : Str
+            Date to end backtest. Format is 'YYYY-MM-DD'. If None, end at the
+            last row.
+
+        Returns
+        -------
+        prices : DataFrame
+            DataFrame of historic prices between the two dates inclusive.
+
+        """
+        # Pandas caches the monotonic check on the index, so this is only
+        # calculated once per index
+        if not prices.index.is_monotonic_increasing:
+            prices = prices.sort_index()
+
+        # Set the start row, defaulting to the first row in the DataFrame
+        if start_date is not None:
+            start_row = prices.index.searchsorted(
+                pd.to_datetime(start_date), side='left')
+        else:
+            start_row = 0
+
+        # Set the end row, defaulting to the last row in the DataFrame
+        if end_date is not None:
+            end_row = prices.index.searchsorted(
+                pd.to_datetime(end_date), side='right')
+        else:
+            end_row = len(prices)
+
+        return prices.iloc[start_row:end_row]
+
+
     @staticmethod
     def _alphavantage_fx(
         ccy_1: str,
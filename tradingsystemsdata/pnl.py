@@ -5,6 +5,8 @@ Profit and Loss functions
 # pylint: disable=E1101
 import numpy as np
 import pandas as pd
+from tradingsystemsdata._njit import kernel
+from tradingsystemsdata.utils import Reformat
 pd.options.mode.chained_assignment = None
 
 class Profit():
@@ -90,14 +92,15 @@ class Profit():
         # daily pnl
         prices = cls._daily_pnl(prices=prices, params=params)
 
-        # total pnl
-        prices['total_pnl'] = np.array([0]*len(prices['Close']), dtype=float)
-        prices['total_pnl'] = prices['daily_pnl'].cumsum()
+        prices = Reformat.add_columns(prices=prices, column_dict={
+            # total pnl
+            'total_pnl': prices['daily_pnl'].cumsum(),
 
-        # position mtm
-        prices['position_mtm'] = (prices['end_of_day_position']
-                                  * prices['Close']
-                                  * params['contract_point_value'])
+            # position mtm
+            'position_mtm': (prices['end_of_day_position']
+                             * prices['Close']
+                             * params['contract_point_value'])
+            })
 
         return prices
 
@@ -128,96 +131,23 @@ class Profit():
         """
 
         # Create series of open, close and position
-        open_ = np.array(prices['Open'])
-        close = np.array(prices['Close'])
-        pos = np.array(prices['end_of_day_position'])
-
-        # Create array of zeros
-        day_pnl = np.array([0]*len(close), dtype=float)
-        last_day_trade_pnl = np.array([0]*len(close), dtype=float)
-
-        # For each row of closing prices
-        for row in range(1, len(close)):
-
-            # If the current position is flat
-            if pos[row] == 0:
+        open_ = np.array(prices['Open'], dtype=np.float64)
+        close = np.array(prices['Close'], dtype=np.float64)
+        pos = np.array(prices['end_of_day_position'], dtype=np.float64)
 
-                # If the previous days position was flat
-                if pos[row - 1] == 0:
-
-                    # Set the pnl to zero
-                    day_pnl[row] = 0
-
-                # Otherwise:
-                else:
-                    # Set the pnl to the previous day's position multiplied by
-                    # the difference between todays open and yesterdays close
-                    # less the cost of slippage and commission
-                    day_pnl[row] = (
-                        ((pos[row - 1] *
-                          (open_[row] - close[row - 1])
-                         - abs(pos[row - 1]
-                               * params['slippage']
-                               * 0.0001
-                               * open_[row]))
-                        - params['commission'])
-                        * params['contract_point_value'])
-
-            # If the current position is not flat
-            else:
-                # If the position is the same as the previous day
-                # if pos[row] == pos[row - 1]:
-                if (pos[row] * pos[row - 1]) > 0:
-
-                    # Set the pnl to the current position * the difference
-                    # between todays close and yesterdays close
-                    day_pnl[row] = (pos[row]
-                                    * (close[row] - close[row - 1])
-                                    * params['contract_point_value'])
-
-                # If the position is reversed from the previous day
-                # elif pos[row] == (-1) * pos[row - 1]:
-                elif (pos[row] * pos[row - 1]) < 0:
-                    day_pnl[row] = (
-                        ((pos[row] * (close[row] - open_[row])
-                         - abs(pos[row]
-                               * params['slippage']
-                               * 0.0001
-                               * open_[row]))
-                        - params['commission'])
-                        * params['contract_point_value'])
-
-                    last_day_trade_pnl[row] = (
-                        ((pos[row - 1] *
-                          (open_[row] - close[row - 1])
-                         - abs(
-                             pos[row - 1]
-                             * params['slippage']
-                             * 0.0001
-                             * open_[row]))
-                        - params['commission'])
-                        * params['contract_point_value'])
-
-                # If the position was opened from flat
-                else:
-                    # Set the pnl to the current position * the difference
-                    # between todays open and todays close less the cost of
-                    # slippage and commission
-                    day_pnl[row] = (
-                        ((pos[row] * (close[row] - open_[row])
-                         - abs(pos[row]
-                               * params['slippage']
-                               * 0.0001
-                               * open_[row]))
-                        - params['commission'])
-                        * params['contract_point_value'])
+        # Calculate the pnl for each row of closing prices
+        day_pnl, last_day_trade_pnl = _profit_loop(
+            open_, close, pos, float(params['slippage']),
+            float(params['commission']),
+            float(params['contract_point_value']))
 
         # Create daily pnl column in DataFrame, rounding to 2dp
-        prices['current_trade_pnl'] = np.round(day_pnl, 2)
-        prices['last_day_trade_pnl'] = last_day_trade_pnl
-        prices['daily_pnl'] = (
-            prices['current_trade_pnl'] + prices['last_day_trade_pnl']
-            )
+        current_trade_pnl = np.round(day_pnl, 2)
+        prices = Reformat.add_columns(prices=prices, column_dict={
+            'current_trade_pnl': current_trade_pnl,
+            'last_day_trade_pnl': last_day_trade_pnl,
+            'daily_pnl': current_trade_pnl + last_day_trade_pnl
+            })
 
         return prices
 
@@ -277,169 +207,33 @@ class Profit():
 
         """
         # Take the trade number and daily pnl series from prices
-        trade_number = np.array(prices['trade_number'])
-        current_trade_pnl = np.array(prices['current_trade_pnl'])
-        last_day_trade_pnl = np.array(prices['last_day_trade_pnl'])
-        daily_pnl = np.array(prices['daily_pnl'])
-
-        # Create arrays of zeros
-        cumulative_trade_pnl = np.array([0.0]*len(daily_pnl))
-        mtm_equity = np.array([0.0]*len(daily_pnl))
-        closed_equity = np.array([0.0]*len(daily_pnl))
-        open_equity = np.array([0.0]*len(daily_pnl))
-        max_trade_pnl = np.array([0.0]*len(daily_pnl))
-
-        # Set the initial equity values
-        mtm_equity[0] = equity
-        closed_equity[0] = equity
-
-        # For each row of data
-        for row in range(1, len(daily_pnl)):
-
-            # The index location of the trade entry date
-            trade_first_row = prices.index.get_loc(
-                prices[trade_number==trade_number[row]].index[0])
-
-            # The number of days since trade entry
-            trade_row_num = row - trade_first_row #type: ignore
-
-            # The index location of the trade entry date
-            trade_last_row = prices.index.get_loc(
-                prices[trade_number==trade_number[row]].index[-1])
-
-            # Set the mtm equity to the previous days mtm equity plus
-            # the days pnl
-            mtm_equity[row] = mtm_equity[row-1] + daily_pnl[row]
-
-            # If there is a current trade
-            if trade_number[row] != 0:
-
-                # If it is the trade entry date and there was no prior trade
-                if (trade_row_num == 0
-                    and trade_number[row - 1] == 0):
-
-                    # Set cumulative trade pnl to the days pnl
-                    cumulative_trade_pnl[row] = daily_pnl[row]
-
-                    # The maximum of the initial days pnl and zero
-                    max_trade_pnl[row] = max(daily_pnl[row], 0)
-
-                    # Set the closed equity to the previous days closed equity
-                    closed_equity[row] = closed_equity[row-1]
-
-                # If it is the trade entry date and this reverses the position
-                # of a prior trade which was in place for multiple days
-                elif (trade_row_num == 0
-                    and trade_number[row - 1] != 0
-                    and (trade_number[row - 1] == trade_number[row - 2])):
-
-                    # Set cumulative trade pnl to the previous days cumulative
-                    # pnl plus the last days pnl
-                    cumulative_trade_pnl[row] = (cumulative_trade_pnl[row-1]
-                                                 + last_day_trade_pnl[row])
-
-                    # The maximum of the current trade equity and the maximum
-                    # trade equity of the previous day
-                    max_trade_pnl[row] = max(
-                        cumulative_trade_pnl[row], max_trade_pnl[row-1])
-
-                    # Set the closed equity to mark to market equity plus the last days trade pnl
-                    closed_equity[row] = (mtm_equity[row-1]
-                                          + last_day_trade_pnl[row])
-
-                # If it is the trade entry date and this reverses the position
-                # of a prior trade which reversed the prior day
-                elif (trade_row_num == 0
-                    and trade_number[row - 1] != 0
-                    and (trade_number[row - 1] != trade_number[row - 2])):
-
-                    # Set cumulative trade pnl to the previous days cumulative
-                    # pnl plus the last days pnl
-                    cumulative_trade_pnl[row] = (current_trade_pnl[row-1] 
-                                                 + last_day_trade_pnl[row])
-
-                    # The maximum of the current trade equity and the maximum
-                    # trade equity of the previous day
-                    max_trade_pnl[row] = (current_trade_pnl[row-1] 
-                                          + last_day_trade_pnl[row])
-
-                    # Set the closed equity to the previous days closed equity
-                    closed_equity[row] = (mtm_equity[row-1]
-                                          + last_day_trade_pnl[row])
-
-                # If it is the trade exit date and not a reversal
-                elif (trade_last_row - row == 0 #type: ignore
-                      and trade_number[row] == trade_number[row - 1]):
-
-                    # Set cumulative trade pnl to the previous days cumulative
-                    # pnl plus the days pnl
-                    cumulative_trade_pnl[row] = (cumulative_trade_pnl[row-1]
-                                                 + daily_pnl[row])
-
-                    # The maximum of the current trade equity and the maximum
-                    # trade equity of the previous day
-                    max_trade_pnl[row] = max(
-                        cumulative_trade_pnl[row], max_trade_pnl[row-1])
-
-                    # Set the closed equity to the mtm equity
-                    closed_equity[row] = mtm_equity[row]
-
-
-                # If it is the second day of a reversal trade
-                elif (trade_row_num == 1
-                      and trade_number[row - 1] != trade_number[row-2]):
-
-                    # Set cumulative trade pnl to the previous days current
-                    # pnl plus the days pnl
-                    cumulative_trade_pnl[row] = (
-                        current_trade_pnl[row - 1] + daily_pnl[row]
-                        )
-
-                    # The maximum of the first and second days pnl and zero
-                    max_trade_pnl[row] = max(
-                        cumulative_trade_pnl[row],
-                        current_trade_pnl[row - 1]
-                        )
-
-                    # Set the closed equity to the previous days closed equity
-                    closed_equity[row] = closed_equity[row-1]
-
-
-                # For every other day in the trade
-                else:
-                    # Set cumulative trade pnl to the previous days cumulative
-                    # pnl plus the days pnl
-                    cumulative_trade_pnl[row] = (
-                        cumulative_trade_pnl[row-1] + daily_pnl[row]
-                        )
-
-                    # The maximum of the current trade equity and the maximum
-                    # trade equity of the previous day
-                    max_trade_pnl[row] = max(
-                        cumulative_trade_pnl[row],
-                        max_trade_pnl[row-1]
-                        )
-
-                    # Set the closed equity to the previous days closed equity
-                    closed_equity[row] = closed_equity[row-1]
-
-
-            # If there is no current trade
-            else:
-                # Set cumulative trade pnl to zero
-                cumulative_trade_pnl[row] = 0
-
-                # Set the closed equity to the previous days closed equity
-                closed_equity[row] = closed_equity[row-1]
-
-            # Current open equity
-            open_equity[row] = mtm_equity[row] - closed_equity[row]
-
-        prices['cumulative_trade_pnl'] = cumulative_trade_pnl
-        prices['max_trade_pnl'] = max_trade_pnl
-        prices['mtm_equity'] = mtm_equity
-        prices['closed_equity'] = closed_equity
-        prices['open_equity'] = open_equity
+        trade_number = np.array(prices['trade_number'], dtype=np.int64)
+
+        # The index locations of the entry and exit dates of the trade on
+        # each row
+        _, first_rows, inverse = np.unique(
+            trade_number, return_index=True, return_inverse=True)
+        _, last_rows = np.unique(trade_number[::-1], return_index=True)
+        trade_first_row = first_rows[inverse].astype(np.int64)
+        trade_last_row = (
+            len(trade_number) - 1 - last_rows[inverse]).astype(np.int64)
+
+        # Calculate the trade pnl and equity for each row
+        cumulative_trade_pnl, max_trade_pnl, mtm_equity, closed_equity, \
+            open_equity = _pnl_equity_loop(
+                trade_number, trade_first_row, trade_last_row,
+                np.array(prices['current_trade_pnl'], dtype=np.float64),
+                np.array(prices['last_day_trade_pnl'], dtype=np.float64),
+                np.array(prices['daily_pnl'], dtype=np.float64),
+                float(equity))
+
+        prices = Reformat.add_columns(prices=prices, column_dict={
+            'cumulative_trade_pnl': cumulative_trade_pnl,
+            'max_trade_pnl': max_trade_pnl,
+            'mtm_equity': mtm_equity,
+            'closed_equity': closed_equity,
+            'open_equity': open_equity
+            })
 
         return prices
 
@@ -471,45 +265,37 @@ class Profit():
         closed_equity = np.array(prices['closed_equity'])
 
         # Create arrays of zeros
-        max_mtm_equity = np.array([0.0]*len(daily_pnl))
-        min_mtm_equity = np.array([0.0]*len(daily_pnl))
-        max_closed_equity = np.array([0.0]*len(daily_pnl))
-        max_retracement = np.array([0.0]*len(daily_pnl))
-        ulcer_index_d_sq = np.array([0.0]*len(daily_pnl))
-
-        # Set the initial equity values
-        max_mtm_equity[0] = equity
-        min_mtm_equity[0] = equity
-        max_closed_equity[0] = equity
-
-        # For each row of data
-        for row in range(1, len(daily_pnl)):
-
-            # Maximum mtm equity to this point
-            max_mtm_equity[row] = np.max(mtm_equity[0:row+1])
-
-            # Minimum mtm equity to this point
-            min_mtm_equity[row] = np.min(mtm_equity[0:row+1])
-
-            # Maximum closed equity to this point
-            max_closed_equity[row] = np.max(closed_equity[:row+1])
-
-            # Maximum of max closed equity and current mtm equity, used in
-            # calculating Average Max Retracement
-            max_retracement[row] = max(
-                (max_closed_equity[row] - mtm_equity[row]), 0)
-
-            # Squared difference between max mtm equity and current mtm equity,
-            # used in calculating Ulcer Index
-            ulcer_index_d_sq[row] = (
-                (((max_mtm_equity[row] - mtm_equity[row])
-                 / max_mtm_equity[row]) * 100) ** 2)
-
-        prices['max_closed_equity'] = max_closed_equity
-        prices['max_retracement'] = max_retracement
-        prices['max_mtm_equity'] = max_mtm_equity
-        prices['min_mtm_equity'] = min_mtm_equity
-        prices['ulcer_index_d_sq'] = ulcer_index_d_sq
+        max_retracement = np.zeros(len(daily_pnl))
+        ulcer_index_d_sq = np.zeros(len(daily_pnl))
+
+        # Maximum and minimum mtm equity and maximum closed equity to each
+        # point, starting from the initial equity
+        max_mtm_equity = np.maximum.accumulate(mtm_equity)
+        min_mtm_equity = np.minimum.accumulate(mtm_equity)
+        max_closed_equity = np.maximum.accumulate(closed_equity)
+        if len(daily_pnl) > 0:
+            max_mtm_equity[0] = equity
+            min_mtm_equity[0] = equity
+            max_closed_equity[0] = equity
+
+        # Maximum of max closed equity and current mtm equity, used in
+        # calculating Average Max Retracement
+        max_retracement[1:] = np.maximum(
+            max_closed_equity[1:] - mtm_equity[1:], 0)
+
+        # Squared difference between max mtm equity and current mtm equity,
+        # used in calculating Ulcer Index
+        ulcer_index_d_sq[1:] = (
+            (((max_mtm_equity[1:] - mtm_equity[1:])
+              / max_mtm_equity[1:]) * 100) ** 2)
+
+        prices = Reformat.add_columns(prices=prices, column_dict={
+            'max_closed_equity': max_closed_equity,
+            'max_retracement': max_retracement,
+            'max_mtm_equity': max_mtm_equity,
+            'min_mtm_equity': min_mtm_equity,
+            'ulcer_index_d_sq': ulcer_index_d_sq
+            })
 
         return prices
 
@@ -538,38 +324,33 @@ class Profit():
         min_mtm_equity = np.array(prices['min_mtm_equity'])
 
         # Create max drawdown and max gain numpy arrays of zeros
-        max_drawdown = np.array([0.0]*len(daily_pnl))
-        max_drawdown_perc = np.array([0.0]*len(daily_pnl))
-        max_gain = np.array([0.0]*len(daily_pnl))
-        max_gain_perc = np.array([0.0]*len(daily_pnl))
-
-        # For each row of data
-        for row in range(1, len(daily_pnl)):
-
-            # Maximum drawdown is the smallest value of the current cumulative
-            # pnl less the max of all previous rows cumulative pnl and zero
-            max_drawdown[row] = mtm_equity[row] - max_mtm_equity[row]
-
-            # Percentage Maximum drawdown
-            max_drawdown_perc[row] = (
-                (mtm_equity[row] - max_mtm_equity[row]) /
-                max_mtm_equity[row]
-                )
-
-            # Maximum gain is the largest value of the current cumulative
-            # pnl less the min of all previous rows and zero
-            max_gain[row] = mtm_equity[row] - min_mtm_equity[row]
-
-            # Percentage Maximum gain
-            max_gain_perc[row] = (
-                (mtm_equity[row] - min_mtm_equity[row]) /
-                min_mtm_equity[row]
-                )
-
-        prices['max_dd'] = max_drawdown
-        prices['max_dd_perc'] = max_drawdown_perc
-        prices['max_gain'] = max_gain
-        prices['max_gain_perc'] = max_gain_perc
+        max_drawdown = np.zeros(len(daily_pnl))
+        max_drawdown_perc = np.zeros(len(daily_pnl))
+        max_gain = np.zeros(len(daily_pnl))
+        max_gain_perc = np.zeros(len(daily_pnl))
+
+        # Maximum drawdown is the smallest value of the current cumulative
+        # pnl less the max of all previous rows cumulative pnl and zero
+        max_drawdown[1:] = mtm_equity[1:] - max_mtm_equity[1:]
+
+        # Percentage Maximum drawdown
+        max_drawdown_perc[1:] = (
+            (mtm_equity[1:] - max_mtm_equity[1:]) / max_mtm_equity[1:])
+
+        # Maximum gain is the largest value of the current cumulative
+        # pnl less the min of all previous rows and zero
+        max_gain[1:] = mtm_equity[1:] - min_mtm_equity[1:]
+
+        # Percentage Maximum gain
+        max_gain_perc[1:] = (
+            (mtm_equity[1:] - min_mtm_equity[1:]) / min_mtm_equity[1:])
+
+        prices = Reformat.add_columns(prices=prices, column_dict={
+            'max_dd': max_drawdown,
+            'max_dd_perc': max_drawdown_perc,
+            'max_gain': max_gain,
+            'max_gain_perc': max_gain_perc
+            })
 
         return prices
 
@@ -597,26 +378,23 @@ class Profit():
         max_trade_pnl = np.array(prices['max_trade_pnl'])
 
         # Create arrays of zeros
-        trade_pnl_drawback = np.array([0.0]*len(daily_pnl))
-        trade_pnl_drawback_perc = np.array([0.0]*len(daily_pnl))
-
-        # For each row of data
-        for row in range(1, len(daily_pnl)):
+        trade_pnl_drawback = np.zeros(len(daily_pnl))
+        trade_pnl_drawback_perc = np.zeros(len(daily_pnl))
 
-            # The difference between the highest equity peak of the trade and
-            # the current trade open equity
-            trade_pnl_drawback[row] = (max_trade_pnl[row]
-                                       - cumulative_trade_pnl[row])
+        # The difference between the highest equity peak of the trade and
+        # the current trade open equity
+        trade_pnl_drawback[1:] = max_trade_pnl[1:] - cumulative_trade_pnl[1:]
 
-            # The percentage difference between the highest equity peak of the
-            # trade and the current trade open equity
-            if max_trade_pnl[row] !=0:
-                trade_pnl_drawback_perc[row] = (
-                    (max_trade_pnl[row] - cumulative_trade_pnl[row])
-                    / max_trade_pnl[row])
+        # The percentage difference between the highest equity peak of the
+        # trade and the current trade open equity
+        peak = np.flatnonzero(max_trade_pnl[1:] != 0) + 1
+        trade_pnl_drawback_perc[peak] = (
+            trade_pnl_drawback[peak] / max_trade_pnl[peak])
 
-        prices['trade_pnl_drawback'] = trade_pnl_drawback
-        prices['trade_pnl_drawback_perc'] = trade_pnl_drawback_perc
+        prices = Reformat.add_columns(prices=prices, column_dict={
+            'trade_pnl_drawback': trade_pnl_drawback,
+            'trade_pnl_drawback_perc': trade_pnl_drawback_perc
+            })
 
         return prices
 
@@ -646,29 +424,27 @@ class Profit():
         close = np.array(prices['Close'])
         pos_pp = np.array(prices['position_size_pp'])
 
-        dpp = np.array([0.0]*len(prices))
-
-        for row in range(params['first_trade_start'], len(dpp)):
-
-            # Calculate Daily Perfect Profit
-            dpp[row] = abs(high[row] - low[row]) * pos_pp[row]
+        dpp = np.zeros(len(prices))
+        rows = slice(params['first_trade_start'], len(dpp))
 
-            # If the High and Low are the same
-            if dpp[row] == 0:
+        # Calculate Daily Perfect Profit
+        dpp[rows] = np.abs(high[rows] - low[rows]) * pos_pp[rows]
 
-                # Use the previous close
-                dpp[row] = abs(high[row] - close[row - 1]) * pos_pp[row]
+        # If the High and Low are the same use the previous close
+        prev_close = np.roll(close, 1)
+        same = np.flatnonzero(dpp == 0)
+        same = same[same >= params['first_trade_start']]
+        dpp[same] = np.abs(high[same] - prev_close[same]) * pos_pp[same]
 
         # Set this to the daily perfect profit
-        prices['daily_perfect_profit'] = dpp * params['contract_point_value']
+        daily_perfect_profit = dpp * params['contract_point_value']
 
-        # Create array of zeros
-        prices['total_perfect_profit'] = np.array(
-            [0.0]*len(prices['Close']), dtype=float)
-
-        # Cumulative sum of daily perfect profit column
-        prices['total_perfect_profit'] = prices[
-            'daily_perfect_profit'].cumsum()
+        # Cumulative sum of daily perfect profit
+        prices = Reformat.add_columns(prices=prices, column_dict={
+            'daily_perfect_profit': daily_perfect_profit,
+            'total_perfect_profit': pd.Series(
+                daily_perfect_profit, index=prices.index).cumsum()
+            })
 
         return prices
 
@@ -682,8 +458,7 @@ class Profit():
         close = np.array(prices['Close'])
         cumulative_trade_pnl = np.array(prices['cumulative_trade_pnl'])
 
-        initial_margin = np.array([0.0]*len(prices))
-        total_margin = np.array([0.0]*len(prices))
+        total_margin = np.zeros(len(prices))
 
         if params['ticker'][0] == '&':
             initial_margin = position_size * params['per_contract_margin']
@@ -691,13 +466,16 @@ class Profit():
         else:
             initial_margin = close * position_size * params['margin_perc'] / 100
 
-        for row in range(params['first_trade_start'], len(prices)):
-            total_margin[row] = (
-                initial_margin[row] + max(0, -cumulative_trade_pnl[row])
-                )
+        # Add any open trade loss to the initial margin
+        rows = slice(params['first_trade_start'], len(prices))
+        trade_loss = -cumulative_trade_pnl[rows]
+        total_margin[rows] = initial_margin[rows] + np.where(
+            trade_loss > 0, trade_loss, 0)
 
-        prices['initial_margin'] = initial_margin
-        prices['total_margin'] = total_margin
+        prices = Reformat.add_columns(prices=prices, column_dict={
+            'initial_margin': initial_margin,
+            'total_margin': total_margin
+            })
 
         return prices
 
@@ -915,3 +693,251 @@ class Profit():
             / (monthly_data['beginning_equity_raw'].iat[0]))
 
         return monthly_data
+
+
+@kernel('UniTuple(f8[:], 2)(f8[:], f8[:], f8[:], f8, f8, f8)')
+def _profit_loop(
+    open_: np.ndarray,
+    close: np.ndarray,
+    pos: np.ndarray,
+    slippage: float,
+    commission: float,
+    contract_point_value: float) -> tuple[np.ndarray, np.ndarray]:
+
+    # Create array of zeros
+    day_pnl = np.zeros(len(close), dtype=np.float64)
+    last_day_trade_pnl = np.zeros(len(close), dtype=np.float64)
+
+    # For each row of closing prices
+    for row in range(1, len(close)):
+
+        # If the current position is flat
+        if pos[row] == 0:
+
+            # If the previous days position was flat
+            if pos[row - 1] == 0:
+
+                # Set the pnl to zero
+                day_pnl[row] = 0
+
+            # Otherwise:
+            else:
+                # Set the pnl to the previous day's position multiplied by
+                # the difference between todays open and yesterdays close
+                # less the cost of slippage and commission
+                day_pnl[row] = (
+                    ((pos[row - 1] *
+                      (open_[row] - close[row - 1])
+                     - abs(pos[row - 1]
+                           * slippage
+                           * 0.0001
+                           * open_[row]))
+                    - commission)
+                    * contract_point_value)
+
+        # If the current position is not flat
+        else:
+            # If the position is the same as the previous day
+            if (pos[row] * pos[row - 1]) > 0:
+
+                # Set the pnl to the current position * the difference
+                # between todays close and yesterdays close
+                day_pnl[row] = (pos[row]
+                                * (close[row] - close[row - 1])
+                                * contract_point_value)
+
+            # If the position is reversed from the previous day
+            elif (pos[row] * pos[row - 1]) < 0:
+                day_pnl[row] = (
+                    ((pos[row] * (close[row] - open_[row])
+                     - abs(pos[row]
+                           * slippage
+                           * 0.0001
+                           * open_[row]))
+                    - commission)
+                    * contract_point_value)
+
+                last_day_trade_pnl[row] = (
+                    ((pos[row - 1] *
+                      (open_[row] - close[row - 1])
+                     - abs(
+                         pos[row - 1]
+                         * slippage
+                         * 0.0001
+                         * open_[row]))
+                    - commission)
+                    * contract_point_value)
+
+            # If the position was opened from flat
+            else:
+                # Set the pnl to the current position * the difference
+                # between todays open and todays close less the cost of
+                # slippage and commission
+                day_pnl[row] = (
+                    ((pos[row] * (close[row] - open_[row])
+                     - abs(pos[row]
+                           * slippage
+                           * 0.0001
+                           * open_[row]))
+                    - commission)
+                    * contract_point_value)
+
+    return day_pnl, last_day_trade_pnl
+
+
+@kernel('UniTuple(f8[:], 5)(i8[:], i8[:], i8[:], f8[:], f8[:], f8[:], f8)')
+def _pnl_equity_loop(
+    trade_number: np.ndarray,
+    trade_first_row: np.ndarray,
+    trade_last_row: np.ndarray,
+    current_trade_pnl: np.ndarray,
+    last_day_trade_pnl: np.ndarray,
+    daily_pnl: np.ndarray,
+    equity: float) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray,
+                            np.ndarray]:
+
+    # Create arrays of zeros
+    cumulative_trade_pnl = np.zeros(len(daily_pnl), dtype=np.float64)
+    mtm_equity = np.zeros(len(daily_pnl), dtype=np.float64)
+    closed_equity = np.zeros(len(daily_pnl), dtype=np.float64)
+    open_equity = np.zeros(len(daily_pnl), dtype=np.float64)
+    max_trade_pnl = np.zeros(len(daily_pnl), dtype=np.float64)
+
+    # Set the initial equity values
+    if len(daily_pnl) > 0:
+        mtm_equity[0] = equity
+        closed_equity[0] = equity
+
+    # For each row of data
+    for row in range(1, len(daily_pnl)):
+
+        # Set the mtm equity to the previous days mtm equity plus
+        # the days pnl
+        mtm_equity[row] = mtm_equity[row-1] + daily_pnl[row]
+
+        # If there is a current trade
+        if trade_number[row] != 0:
+
+            # If it is the trade entry date and there was no prior trade
+            if (row == trade_first_row[row]
+                and trade_number[row - 1] == 0):
+
+                # Set cumulative trade pnl to the days pnl
+                cumulative_trade_pnl[row] = daily_pnl[row]
+
+                # The maximum of the initial days pnl and zero
+                max_trade_pnl[row] = max(daily_pnl[row], 0)
+
+                # Set the closed equity to the previous days closed equity
+                closed_equity[row] = closed_equity[row-1]
+
+            # If it is the trade entry date and this reverses the position
+            # of a prior trade which was in place for multiple days
+            elif (row == trade_first_row[row]
+                and trade_number[row - 1] != 0
+                and (trade_number[row - 1] == trade_number[row - 2])):
+
+                # Set cumulative trade pnl to the previous days cumulative
+                # pnl plus the last days pnl
+                cumulative_trade_pnl[row] = (cumulative_trade_pnl[row-1]
+                                             + last_day_trade_pnl[row])
+
+                # The maximum of the current trade equity and the maximum
+                # trade equity of the previous day
+                max_trade_pnl[row] = max(
+                    cumulative_trade_pnl[row], max_trade_pnl[row-1])
+
+                # Set the closed equity to mark to market equity plus the last days trade pnl
+                closed_equity[row] = (mtm_equity[row-1]
+                                      + last_day_trade_pnl[row])
+
+            # If it is the trade entry date and this reverses the position
+            # of a prior trade which reversed the prior day
+            elif (row == trade_first_row[row]
+                and trade_number[row - 1] != 0
+                and (trade_number[row - 1] != trade_number[row - 2])):
+
+                # Set cumulative trade pnl to the previous days cumulative
+                # pnl plus the last days pnl
+                cumulative_trade_pnl[row] = (current_trade_pnl[row-1]
+                                             + last_day_trade_pnl[row])
+
+                # The maximum of the current trade equity and the maximum
+                # trade equity of the previous day
+                max_trade_pnl[row] = (current_trade_pnl[row-1]
+                                      + last_day_trade_pnl[row])
+
+                # Set the closed equity to the previous days closed equity
+                closed_equity[row] = (mtm_equity[row-1]
+                                      + last_day_trade_pnl[row])
+
+            # If it is the trade exit date and not a reversal
+            elif (trade_last_row[row] == row
+                  and trade_number[row] == trade_number[row - 1]):
+
+                # Set cumulative trade pnl to the previous days cumulative
+                # pnl plus the days pnl
+                cumulative_trade_pnl[row] = (cumulative_trade_pnl[row-1]
+                                             + daily_pnl[row])
+
+                # The maximum of the current trade equity and the maximum
+                # trade equity of the previous day
+                max_trade_pnl[row] = max(
+                    cumulative_trade_pnl[row], max_trade_pnl[row-1])
+
+                # Set the closed equity to the mtm equity
+                closed_equity[row] = mtm_equity[row]
+
+
+            # If it is the second day of a reversal trade
+            elif (row - trade_first_row[row] == 1
+                  and trade_number[row - 1] != trade_number[row-2]):
+
+                # Set cumulative trade pnl to the previous days current
+                # pnl plus the days pnl
+                cumulative_trade_pnl[row] = (
+                    current_trade_pnl[row - 1] + daily_pnl[row]
+                    )
+
+                # The maximum of the first and second days pnl and zero
+                max_trade_pnl[row] = max(
+                    cumulative_trade_pnl[row],
+                    current_trade_pnl[row - 1]
+                    )
+
+                # Set the closed equity to the previous days closed equity
+                closed_equity[row] = closed_equity[row-1]
+
+
+            # For every other day in the trade
+            else:
+                # Set cumulative trade pnl to the previous days cumulative
+                # pnl plus the days pnl
+                cumulative_trade_pnl[row] = (
+                    cumulative_trade_pnl[row-1] + daily_pnl[row]
+                    )
+
+                # The maximum of the current trade equity and the maximum
+                # trade equity of the previous day
+                max_trade_pnl[row] = max(
+                    cumulative_trade_pnl[row],
+                    max_trade_pnl[row-1]
+                    )
+
+                # Set the closed equity to the previous days closed equity
+                closed_equity[row] = closed_equity[row-1]
+
+
+        # If there is no current trade
+        else:
+            # Set cumulative trade pnl to zero
+            cumulative_trade_pnl[row] = 0
+
+            # Set the closed equity to the previous days closed equity
+            closed_equity[row] = closed_equity[row-1]
+
+        # Current open equity
+        open_equity[row] = mtm_equity[row] - closed_equity[row]
+
+    return (cumulative_trade_pnl, max_trade_pnl, mtm_equity, closed_equity,
+            open_equity)
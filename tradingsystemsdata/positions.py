@@ -8,6 +8,7 @@ import numpy as np
 from technicalmethods.methods import Indicators
 import pandas as pd
 from pandas.tseries.offsets import BDay
+from tradingsystemsdata._njit import kernel
 pd.options.mode.chained_assignment = None
 
 
@@ -19,7 +20,7 @@ class Positions():
     @staticmethod
     def calc_positions(
         prices: pd.DataFrame,
-        signal: pd.Series,
+        signal: pd.Series | np.ndarray,
         start: int) -> dict:
         """
         Calculate start of day and end of day positions and any buy / sell
@@ -29,7 +30,7 @@ class Positions():
         ----------
         prices : DataFrame
             The OHLC data.
-        signal : Series
+        signal : Series or ndarray
             The series of Buy / Sell trade signals.
         start : Int
             The first valid row to start calculating trade information from.
@@ -46,29 +47,19 @@ class Positions():
             Whether Long / Short or Flat at the end of the day.
 
         """
-        # Extract the trade signal from the OHLC Data
-        eod_trade_signal = np.array(signal)
+        # Extract the trade signal from the OHLC Data, only copying if it
+        # isn't already a writeable float64 array
+        eod_trade_signal = np.require(
+            signal, dtype=np.float64, requirements=['C', 'W'])
 
-        # Create empty arrays to store data
-        start_of_day_position = np.array([0]*len(prices))
-        trade_action = np.array([0]*len(prices))
-        end_of_day_position = np.array([0]*len(prices))
+        # The signal is mapped back to the OHLC data so must match its length
+        if len(eod_trade_signal) != len(prices):
+            raise ValueError("The signal must be the same length as prices")
 
-        # For each valid row in the data
-        for row in range(start, len(prices)):
-
-            # The start of day position is equal to the close of day position
-            # of the previous day
-            start_of_day_position[row] = end_of_day_position[row-1]
-
-            # The trade action is the previous days trade signal multiplied by
-            # the position size
-            trade_action[row] = eod_trade_signal[row-1]
-
-            # The end of day position is the start of day position plus any
-            # trade action
-            end_of_day_position[row] = (start_of_day_position[row]
-                                        + trade_action[row])
+        # Calculate the positions and trade actions for each valid row
+        start_of_day_position, trade_action, \
+            end_of_day_position = _calc_positions_loop(
+                eod_trade_signal, int(start))
 
         pos_dict = {}
         pos_dict['start_of_day_position'] = start_of_day_position
@@ -596,3 +587,32 @@ class Positions():
         prices['position_size_pp'] = position_size_pp
 
         return prices, params
+
+
+@kernel('UniTuple(i8[:], 3)(f8[:], i8)')
+def _calc_positions_loop(
+    eod_trade_signal: np.ndarray,
+    start: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+
+    # Create empty arrays to store data
+    start_of_day_position = np.zeros(len(eod_trade_signal), dtype=np.int64)
+    trade_action = np.zeros(len(eod_trade_signal), dtype=np.int64)
+    end_of_day_position = np.zeros(len(eod_trade_signal), dtype=np.int64)
+
+    # For each valid row in the data
+    for row in range(start, len(eod_trade_signal)):
+
+        # The start of day position is equal to the close of day position
+        # of the previous day
+        start_of_day_position[row] = end_of_day_position[row-1]
+
+        # The trade action is the previous days trade signal multiplied by
+        # the position size
+        trade_action[row] = int(eod_trade_signal[row-1])
+
+        # The end of day position is the start of day position plus any
+        # trade action
+        end_of_day_position[row] = (start_of_day_position[row]
+                                    + trade_action[row])
+
+    return start_of_day_position, trade_action, end_of_day_position
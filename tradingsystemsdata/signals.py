@@ -75,7 +75,8 @@ class Signals():
         # Calculate initial position info
         raw_pos_dict = Positions.calc_positions(
             prices=tables['prices'],
-            signal=tables['prices']['raw_trade_signal'],
+            signal=tables['prices']['raw_trade_signal'].to_numpy(
+                dtype=np.float64, copy=True),
             start=params['start'])
 
         # Generate trade numbers
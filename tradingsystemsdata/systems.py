@@ -5,9 +5,18 @@ results in table and graph form.
 """
 
 # Imports
-import copy
-
-from tradingsystemsdata.marketdata import NorgateFunctions
+import atexit
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import itertools
+import multiprocessing
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from tradingsystemsdata.marketdata import Markets, NorgateFunctions
 from tradingsystemsdata.positions import Positions
 from tradingsystemsdata.pnl import Profit
 from tradingsystemsdata.reports import PerfReport
@@ -15,7 +24,117 @@ from tradingsystemsdata.signals import Signals, CalculateSignalData
 from tradingsystemsdata.systems_params import system_params_dict
 from tradingsystemsdata.targets import TradeTargets
 from tradingsystemsdata.trades import Trades
-from tradingsystemsdata.utils import Setup, Labels, Reformat
+from tradingsystemsdata.utils import Setup, Labels
+
+# Columns of the prices table stored for each ticker in a portfolio
+_PORTFOLIO_PRICE_COLUMNS = [
+    'Close', 'mtm_equity', 'end_of_day_position', 'trade_number',
+    'daily_pnl', 'cumulative_trade_pnl']
+
+# Equity and cumulative pnl columns, which accumulate over the backtest so
+# are kept in float64 when storing portfolio data
+_FLOAT64_PRICE_COLUMNS = [
+    'total_pnl', 'cumulative_trade_pnl', 'max_trade_pnl', 'mtm_equity',
+    'closed_equity', 'open_equity', 'max_closed_equity', 'max_mtm_equity',
+    'min_mtm_equity', 'total_perfect_profit']
+
+# Price columns stored as float32 when running a backtest in single precision
+_OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# Longnames for Norgate Tickers, loaded once per session
+_NORGATE_NAME_DICT = None
+
+# Worker processes shared by all portfolio backtests in a session
+_PORTFOLIO_POOL = None
+
+# Whether the pool shutdown has been registered to run on exit
+_POOL_EXIT_REGISTERED = False
+
+
+def _norgate_names() -> dict:
+    """
+    Return the dictionary of Norgate ticker longnames, loading it from
+    Norgate Data on first use.
+
+    Returns
+    -------
+    norgate_name_dict : Dict
+        Dictionary lookup of Norgate tickers to long names.
+
+    """
+    global _NORGATE_NAME_DICT # pylint: disable=global-statement
+    if _NORGATE_NAME_DICT is None:
+        _NORGATE_NAME_DICT = NorgateFunctions.get_norgate_name_dict()
+    return _NORGATE_NAME_DICT
+
+
+def clear_caches() -> None:
+    """
+    Clear the cached Norgate ticker longnames and downloaded price data, so
+    that they are reloaded on next use, e.g. if Norgate adds instruments
+    during a session. The worker processes keep their own caches, so the
+    pool is shut down and a new one started on the next portfolio run.
+
+    Returns
+    -------
+    None.
+
+    """
+    global _NORGATE_NAME_DICT # pylint: disable=global-statement
+    _NORGATE_NAME_DICT = None
+    Setup.clear_price_cache()
+    TestPortfolio.shutdown_pool()
+
+
+def _clone_params_dict() -> dict:
+    """
+    Copy the dictionary of default parameters. The values are primitives,
+    tuples or dictionaries nested at most two levels deep, so copying each
+    container explicitly is much cheaper than copy.deepcopy.
+
+    Returns
+    -------
+    default_dict : Dict
+        Copy of the dictionary of default parameters.
+
+    """
+    default_dict = {}
+    for key, value in system_params_dict.items():
+        if isinstance(value, dict):
+            # Copy one further level for the entry / exit / stop signal
+            # dictionaries and the contract months held in df_params
+            value = {
+                inner_key: (inner_value.copy()
+                            if isinstance(inner_value, (dict, list))
+                            else inner_value)
+                for inner_key, inner_value in value.items()}
+        elif isinstance(value, list):
+            value = value.copy()
+        default_dict[key] = value
+
+    return default_dict
+
+
+def _source_by_market(equity_source: str) -> dict:
+    """
+    Map each market to the data source used for its tickers. Markets not
+    in the map use AlphaVantage.
+
+    Parameters
+    ----------
+    equity_source : Str
+        The data source requested for equities.
+
+    Returns
+    -------
+    source_by_market : Dict
+        Dictionary lookup of market to ticker source.
+
+    """
+    return {
+        'commodities': 'norgate',
+        'equities': 'yahoo' if equity_source == 'yahoo' else 'alpha'
+        }
 
 
 class TestStrategy():
@@ -76,6 +195,12 @@ class TestStrategy():
         The default is 1.
     exit_type : Str, optional
         The exit strategy. The default is 'trailing_stop'.
+    generate_signals : Bool, optional
+        Whether to generate the signal data when the strategy is created. If
+        False, the signals are generated the first time params is accessed.
+        In this case the prices table is left as calculated by the backtest,
+        rather than being back filled as it is when the signals are
+        generated on creation. The default is True.
     lookback : Int, optional
         Number of business days to use for the backtest. The default is 750
         business days (circa 3 years).
@@ -128,24 +253,75 @@ class TestStrategy():
 
     def __init__(self, **kwargs):
 
+        # Whether to generate the signal data now or on first access of params
+        generate_signals = kwargs.pop('generate_signals', True)
+
         # Import dictionary of default parameters
-        self.default_dict = copy.deepcopy(system_params_dict)
+        self.default_dict = _clone_params_dict()
 
         # Generate backtest
         params, tables, labels, norgate_name_dict = self.run_backtest(**kwargs)
 
-        # Generate signals when graph isn't drawn.    
-        params = CalculateSignalData.generate_signals(
-            default_dict=self.default_dict, 
-            params=params, 
-            tables=tables
-            )
-        
-        self.params = params
+        self._params = params
         self.tables = tables
         self.labels = labels
         self.norgate_name_dict = norgate_name_dict
- 
+
+        # Generate signals when graph isn't drawn.
+        if generate_signals:
+            self.params = self._generate_signals_now(tables=self.tables)
+
+
+    def __getattr__(self, name):
+        # Only called when params has not yet been set, so generate the
+        # signals on first access. A copy of the tables dictionary is used so
+        # that reading params doesn't replace the prices table with the back
+        # filled version used for the signals.
+        if name == 'params' and '_params' in self.__dict__:
+            self.params = self._generate_signals_now(tables=dict(self.tables))
+            return self.params
+
+        raise AttributeError(
+            f"'{type(self).__name__}' object has no attribute '{name}'")
+
+
+    @property
+    def backtest_params(self) -> dict:
+        """
+        The backtest parameters, without generating the signal data if it
+        hasn't been generated already.
+
+        Returns
+        -------
+        params : Dict
+            Dictionary of parameters.
+
+        """
+        return self._params
+
+
+    def _generate_signals_now(self, tables: dict) -> dict:
+        """
+        Generate the signal data and add it to the backtest parameters.
+
+        Parameters
+        ----------
+        tables : Dict
+            Dictionary of tables. The prices table is replaced with a back
+            filled copy.
+
+        Returns
+        -------
+        params : Dict
+            Dictionary of parameters including the signal data.
+
+        """
+        return CalculateSignalData.generate_signals(
+            default_dict=self.default_dict,
+            params=self._params,
+            tables=tables
+            )
+
 
     @staticmethod
     def run_backtest(**kwargs):
@@ -156,6 +332,16 @@ class TestStrategy():
         ----------
         params : Dict
             Dictionary of parameters.
+        compute_perf_report : Bool, optional
+            Whether to create the strategy labels and the dictionary of
+            performance data. The default is True.
+        fp32 : Bool, optional
+            Whether to store the OHLC and volume data as float32, halving
+            the memory used by the indicator calculations. The signals,
+            stops and position sizes are then calculated from the rounded
+            prices, so trades and positions can differ from a float64
+            backtest. The equity and pnl data are accumulated in float64
+            regardless. The default is False.
 
         Returns
         -------
@@ -173,32 +359,38 @@ class TestStrategy():
         # Longnames for Norgate Tickers
         norgate_name_dict = {}
 
-        # Store initial inputs
-        inputs = {}
-        for key, value in kwargs.items():
-            inputs[key] = value
+        # Store initial inputs, leaving any supplied data tables out of the
+        # parameters
+        inputs = dict(kwargs)
+        tables = inputs.pop('tables', {})
+        compute_perf_report = inputs.pop('compute_perf_report', True)
+        fp32 = inputs.pop('fp32', False)
 
         # Initialise system parameters
         params = Setup.init_params(inputs)
 
         # Longnames for Norgate Tickers
         if params['ticker_source'] == 'norgate':
-            norgate_name_dict = NorgateFunctions.get_norgate_name_dict()
+            norgate_name_dict = _norgate_names()
             params['asset_type'] = 'commodity'
 
         # if params['ticker_source'] == 'yahoo':
         #     params['asset_type'] = 'equity'
 
         # Create DataFrame of OHLC prices from NorgateData or Yahoo Finance
-        tables = kwargs.get('tables', {})
-
         params, tables = Setup.prepare_data(params, tables)
 
+        # Downcast the OHLC and volume data to single precision
+        if fp32:
+            tables['prices'] = tables['prices'].astype(
+                {column: np.float32 for column in _OHLCV_COLUMNS
+                 if column in tables['prices'].columns})
+
         # Set the strategy labels
-        labels  = {}
-        labels['entry_label'], labels['exit_label'], \
-            labels['stop_label'] = Labels.strategy_labels(
-                params=params, default_dict=system_params_dict)
+        if compute_perf_report:
+            labels['entry_label'], labels['exit_label'], \
+                labels['stop_label'] = Labels.strategy_labels(
+                    params=params, default_dict=system_params_dict)
 
         # Generate initial trade data
         tables, params, raw_trade_price_dict = Signals.raw_entry_signals(
@@ -216,26 +408,21 @@ class TestStrategy():
         # Prepare final signals
         tables = Signals.final_signals(params, tables)
 
-        # Create trade and position data
+        # Create trade and position data from the combined signal, extracted
+        # once as a float64 array
         pos_dict = Positions.calc_positions(
             prices=tables['prices'],
-            signal=tables['prices']['combined_signal'],
+            signal=tables['prices']['combined_signal'].to_numpy(
+                dtype=np.float64, copy=True),
             start=params['start'])
 
-        # Scale the position info by the position size
-        pos_dict = Reformat.position_scale(
-            pos_dict=pos_dict, position_size=tables['prices']['position_size'])
-
-        # Map the raw positions to the OHLC data
-        tables['prices'] = Reformat.map_to_prices(
-            prices=tables['prices'],
-            input_dict=pos_dict,
-            title_modifier='')
-
-        tables['prices']['trade_number'] = Trades.trade_numbers(
-            prices=tables['prices'],
-            end_of_day_position=tables['prices']['end_of_day_position'],
-            start=params['start'])
+        # Scale the position info by the position size, generate the trade
+        # numbers and map both to the OHLC data in a single pass
+        tables['prices'] = tables['prices'].assign(
+            **Trades.scale_positions_and_number_trades(
+                pos_dict=pos_dict,
+                position_size=tables['prices']['position_size'],
+                start=params['start']))
 
         # Calculate the trades and pnl for the strategy
         tables['prices'] = Profit.profit_data(
@@ -247,9 +434,10 @@ class TestStrategy():
             prices=tables['prices'], equity=params['equity'])
 
         # Create dictionary of performance data
-        tables['perf_dict'] = PerfReport.performance_data(
-            tables=tables, params=params, labels=labels,
-            norgate_name_dict=norgate_name_dict)
+        if compute_perf_report:
+            tables['perf_dict'] = PerfReport.performance_data(
+                tables=tables, params=params, labels=labels,
+                norgate_name_dict=norgate_name_dict)
 
         return params, tables, labels, norgate_name_dict
 
@@ -273,10 +461,165 @@ class TestStrategy():
         PerfReport.report_table(input_dict=input_dict)
 
 
+def _run_one(
+    args: tuple,
+    kwargs: dict,
+    keep_columns: list | None) -> tuple[str, dict]:
+    """
+    Run a single ticker backtest. Defined at module level so that it can be
+    pickled and sent to a worker process.
+
+    Parameters
+    ----------
+    args : Tuple
+        The market, ticker and ticker source.
+    kwargs : Dict
+        All other keyword parameters.
+    keep_columns : List
+        The columns of the prices table to keep. If None, all columns are
+        kept.
+
+    Returns
+    -------
+    ticker : Str
+        The ticker that was tested.
+    ticker_dict : Dict
+        Dictionary of the parameters, prices and monthly data.
+
+    """
+    _, ticker, ticker_source = args
+    strat = TestStrategy(ticker=ticker,
+                         ticker_source=ticker_source,
+                         generate_signals=False,
+                         compute_perf_report=False,
+                         **kwargs)
+
+    # The portfolio only uses the prices and monthly data so the signals and
+    # performance report are not generated
+    return ticker, _portfolio_entry(
+        params=strat.backtest_params, tables=strat.tables,
+        keep_columns=keep_columns)
+
+
+def _run_perf_report(inputs: dict) -> dict:
+    """
+    Rerun a backtest in a worker process and return its performance data.
+
+    Parameters
+    ----------
+    inputs : Dict
+        The keyword parameters of the backtest.
+
+    Returns
+    -------
+    perf_dict : Dict
+        Dictionary of performance data.
+
+    """
+    _, tables, _, _ = TestStrategy.run_backtest(**inputs)
+
+    return tables['perf_dict']
+
+
+def _map_backtests(
+    func,
+    tasks: list,
+    *args,
+    parallel: bool = True):
+    """
+    Apply a backtest function to each task, in the pool of worker processes
+    if running in parallel and there is more than one task, otherwise in
+    this process.
+
+    Parameters
+    ----------
+    func : Function
+        Module level function taking a task and the further arguments.
+    tasks : List
+        The tasks to run.
+    *args : Tuple
+        Further arguments passed to each call of the function.
+    parallel : Bool, optional
+        Whether to run the tasks in worker processes. The default is True.
+
+    Yields
+    ------
+    result : Tuple
+        The result of each task, in the order of the tasks.
+
+    """
+    if not parallel or len(tasks) < 2:
+        for task in tasks:
+            yield func(task, *args)
+        return
+
+    executor = TestPortfolio.get_pool()
+    try:
+        yield from executor.map(
+            func, tasks, *([arg] * len(tasks) for arg in args), chunksize=1)
+
+    except BrokenProcessPool:
+        # Discard the pool so that the next run starts a new one
+        TestPortfolio.shutdown_pool()
+        raise
+
+
+def _portfolio_entry(
+    params: dict,
+    tables: dict,
+    keep_columns: list | None) -> dict:
+    """
+    Extract the data stored for each ticker in a portfolio, keeping only the
+    selected price columns and storing floating point data other than equity
+    and cumulative pnl as float32. The prices are back filled, matching the
+    table of a strategy that generated its signals. Table sized parameters,
+    such as the supplied market data, are not stored.
+
+    Parameters
+    ----------
+    params : Dict
+        Dictionary of parameters.
+    tables : Dict
+        Dictionary of tables.
+    keep_columns : List
+        The columns of the prices table to keep. If None, all columns are
+        kept.
+
+    Returns
+    -------
+    ticker_dict : Dict
+        Dictionary of the parameters, prices and monthly data.
+
+    """
+    prices = tables['prices']
+    if keep_columns is not None:
+        prices = prices[keep_columns]
+
+    # Back fill the indicator warm up rows, as when the signals are generated
+    prices = prices.bfill()
+
+    prices = prices.astype(
+        {column: np.float32
+         for column in prices.select_dtypes(include='float64').columns
+         if column not in _FLOAT64_PRICE_COLUMNS})
+
+    params = {key: value for key, value in params.items()
+              if not isinstance(value, (pd.DataFrame, pd.Series, np.ndarray))}
+
+    return {'params':params,
+            'prices':prices,
+            'monthly_data':tables['monthly_data']}
+
+
 class TestPortfolio():
     """
     Run backtests over a portfolio of tickers
 
+    Portfolios of more than one ticker are run in worker processes, which
+    import the main module of the calling script when they start. Scripts
+    must therefore create the portfolio under an
+    if __name__ == '__main__': guard, or pass parallel=False.
+
     """
     def __init__(self, **kwargs):
 
@@ -284,6 +627,57 @@ class TestPortfolio():
         self.system_dict = self.run_individual_tests_with_data(**kwargs)
 
 
+    @staticmethod
+    def get_pool() -> ProcessPoolExecutor:
+        """
+        Return the pool of worker processes used to run portfolio backtests,
+        creating it on first use. The pool is kept for the rest of the
+        session so repeated portfolio runs don't pay the worker startup cost.
+
+        Returns
+        -------
+        pool : ProcessPoolExecutor
+            The pool of worker processes.
+
+        """
+        global _PORTFOLIO_POOL # pylint: disable=global-statement
+        global _POOL_EXIT_REGISTERED # pylint: disable=global-statement
+        if _PORTFOLIO_POOL is None:
+            if sys.platform.startswith('linux'):
+                context = multiprocessing.get_context('forkserver')
+            else:
+                context = multiprocessing.get_context('spawn')
+
+            _PORTFOLIO_POOL = ProcessPoolExecutor(
+                max_workers=os.cpu_count() or 1,
+                mp_context=context)
+
+            # Only register the shutdown once, however often the pool is
+            # recreated
+            if not _POOL_EXIT_REGISTERED:
+                atexit.register(TestPortfolio.shutdown_pool)
+                _POOL_EXIT_REGISTERED = True
+
+        return _PORTFOLIO_POOL
+
+
+    @staticmethod
+    def shutdown_pool() -> None:
+        """
+        Shut down the pool of worker processes, if running. A new pool is
+        created on the next portfolio run.
+
+        Returns
+        -------
+        None.
+
+        """
+        global _PORTFOLIO_POOL # pylint: disable=global-statement
+        if _PORTFOLIO_POOL is not None:
+            _PORTFOLIO_POOL.shutdown()
+            _PORTFOLIO_POOL = None
+
+
     @staticmethod
     def run_individual_tests(portfolio: dict, **kwargs) -> dict:
         """
@@ -302,6 +696,10 @@ class TestPortfolio():
             crypto : List, optional
                 List of crypto tickers in portfolio.
 
+        verbose : Bool, optional
+            Whether to print each market and ticker as it is tested. The
+            default is True.
+
         **kwargs : Dict
             All other keyword parameter.
 
@@ -312,25 +710,21 @@ class TestPortfolio():
 
         """
         system_dict = {}
-        # benchmark_calc = False
+        verbose = kwargs.pop('verbose', True)
+        source_by_market = _source_by_market(
+            kwargs.get('equity_source', 'yahoo'))
+
         for market, underlying_list in portfolio.items():
-            print(market)
+            if verbose:
+                print(market)
+            ticker_source = source_by_market.get(market, 'alpha')
             for underlying in underlying_list:
-                print(underlying)
-
-                if market == 'commodities':
-                    strat = TestStrategy(ticker=underlying,
-                                         ticker_source='norgate',
-                                         **kwargs)
-                elif (market == 'equities'
-                      and kwargs.get('equity_source', 'yahoo') == 'yahoo'):
-                    strat = TestStrategy(ticker=underlying,
-                                         ticker_source='yahoo',
-                                         **kwargs)
-                else:
-                    strat = TestStrategy(ticker=underlying,
-                                         ticker_source='alpha',
-                                         **kwargs)
+                if verbose:
+                    print(underlying)
+
+                strat = TestStrategy(ticker=underlying,
+                                     ticker_source=ticker_source,
+                                     **kwargs)
 
                 system_dict[underlying] = {'model':strat}
                 system_dict[underlying].update(
@@ -344,7 +738,11 @@ class TestPortfolio():
     @staticmethod
     def run_individual_tests_with_data(portfolio: dict, **kwargs) -> dict:
         """
-        Run backtests for each of the provided tickers.
+        Run backtests for each of the provided tickers, with each ticker
+        tested in a separate worker process. The worker processes import the
+        main module of the calling script when they start, so a script must
+        call this under an if __name__ == '__main__': guard unless parallel
+        is False.
 
         Parameters
         ----------
@@ -359,6 +757,21 @@ class TestPortfolio():
             crypto : List, optional
                 List of crypto tickers in portfolio.
 
+        keep_columns : List, optional
+            The columns of each tickers prices table to store, as float32
+            where they are floating point. If None, all columns are kept. The
+            default is the close, equity, position, trade number and pnl
+            columns.
+
+        verbose : Bool, optional
+            Whether to print each market and ticker as it is tested. The
+            default is True.
+
+        parallel : Bool, optional
+            Whether to run the backtests in worker processes. If False, or
+            there is only one ticker, they are run in this process. The
+            default is True.
+
         **kwargs : Dict
             All other keyword parameter.
 
@@ -369,49 +782,227 @@ class TestPortfolio():
 
         """
         system_dict = {}
+        keep_columns = kwargs.pop('keep_columns', _PORTFOLIO_PRICE_COLUMNS)
+        verbose = kwargs.pop('verbose', True)
+        parallel = kwargs.pop('parallel', True)
         start_date = kwargs.get('start_date', None)
         end_date = kwargs.get('end_date', None)
-        #data = kwargs.get('data', None)
+        source_by_market = _source_by_market(
+            kwargs.get('equity_source', 'yahoo'))
+
+        # Resolve the data source for each ticker up front so that each
+        # backtest can be run independently in a worker process. The market
+        # data isn't used by the backtest so isn't sent to the workers.
+        tasks = []
         for market, underlying_dict in portfolio.items():
-            print(market)
-            for ticker, market_data in underlying_dict.items():
-                print(ticker)
-                #if data is not None:
-                #    start = str(data[0][1].index[0].date())
-                #    end = str(data[0][1].index[-1].date())
-                #else:
-                #    start is None
-                #    end is None
-
-                if market == 'commodities':
-                    strat = TestStrategy(ticker=ticker,
-                                         ticker_source='norgate',
-                                         market_data=market_data,
-                                         #start_date = start,
-                                         #end_date = end,
-                                         **kwargs)
-                elif (market == 'equities'
-                      and kwargs.get('equity_source', 'yahoo') == 'yahoo'):
-                    strat = TestStrategy(ticker=ticker,
-                                         ticker_source='yahoo',
-                                         market_data=market_data,
-                                         **kwargs)
-                else:
-                    strat = TestStrategy(ticker=ticker,
-                                         ticker_source='alpha',
-                                         market_data=market_data,
-                                         **kwargs)
-
-                system_dict[ticker] = {'model':strat}
-                system_dict[ticker].update(
-                    {'prices':strat.tables['prices']})
-                system_dict[ticker].update(
-                    {'monthly_data':strat.tables['monthly_data']})
+            if verbose:
+                print(market)
+            ticker_source = source_by_market.get(market, 'alpha')
+            for ticker in underlying_dict:
+                if verbose:
+                    print(ticker)
+                tasks.append((market, ticker, ticker_source))
+
+        # Download the benchmark data in a background thread while the
+        # backtests run, as soon as the dates are known
+        with ThreadPoolExecutor(max_workers=1) as benchmark_executor:
+            benchmark_future = None
+            if start_date is not None and end_date is not None:
+                benchmark_future = benchmark_executor.submit(
+                    NorgateFunctions.return_norgate_data, '$SPX',
+                    {'start_date':start_date, 'end_date':end_date})
+
+            for task, (ticker, ticker_dict) in zip(
+                    tasks, _map_backtests(
+                        _run_one, tasks, kwargs, keep_columns,
+                        parallel=parallel)):
+                # Store the inputs so that the performance report can be
+                # created later if needed, with the dates resolved by the
+                # backtest so that it covers the same period.
+                strat_params = ticker_dict['params']
+                ticker_dict['inputs'] = {
+                    'ticker':ticker,
+                    'ticker_source':task[2],
+                    **kwargs,
+                    'start_date':strat_params['start_date'],
+                    'end_date':strat_params['end_date']}
+                system_dict[ticker] = ticker_dict
 
                 if start_date is None:
-                    start_date = strat.params['start_date']
+                    start_date = strat_params['start_date']
                 if end_date is None:
-                    end_date = strat.params['end_date']
+                    end_date = strat_params['end_date']
+
+                if benchmark_future is None:
+                    benchmark_future = benchmark_executor.submit(
+                        NorgateFunctions.return_norgate_data, '$SPX',
+                        {'start_date':start_date, 'end_date':end_date})
+
+            if benchmark_future is None:
+                benchmark_future = benchmark_executor.submit(
+                    NorgateFunctions.return_norgate_data, '$SPX',
+                    {'start_date':start_date, 'end_date':end_date})
+
+            system_dict['benchmark'] = benchmark_future.result()
+
+        return system_dict
+
+
+    @staticmethod
+    def compute_perf_reports_lazy(
+        system_dict: dict,
+        parallel: bool = True) -> dict:
+        """
+        Create the performance data for each ticker in a portfolio that was
+        run without it, by rerunning the backtests from the stored inputs in
+        the pool of worker processes.
+
+        Parameters
+        ----------
+        system_dict : Dict
+            Dictionary containing returns data for each underlying.
+        parallel : Bool, optional
+            Whether to rerun the backtests in worker processes. If False, or
+            there is only one ticker to rerun, they are run in this process.
+            The default is True.
+
+        Returns
+        -------
+        system_dict : Dict
+            Dictionary containing returns data for each underlying, with the
+            dictionary of performance data added as perf_dict.
+
+        """
+        # Skip the benchmark and any tickers that already have the data
+        pending = [
+            ticker_dict for ticker_dict in system_dict.values()
+            if (isinstance(ticker_dict, dict)
+                and 'inputs' in ticker_dict
+                and 'perf_dict' not in ticker_dict)]
+
+        for ticker_dict, perf_dict in zip(pending, _map_backtests(
+                _run_perf_report,
+                [ticker_dict['inputs'] for ticker_dict in pending],
+                parallel=parallel)):
+            ticker_dict['perf_dict'] = perf_dict
+
+        return system_dict
+
+
+    @staticmethod
+    def run_individual_tests_vectorized(portfolio: dict, **kwargs) -> dict:
+        """
+        Run backtests for each of the provided tickers, calculating the
+        simple moving averages used by the moving average entries for all
+        the tickers in a single pass before running each backtest on the
+        supplied data.
+
+        Parameters
+        ----------
+        portfolio : Dict
+            Dictionary of dictionaries of underlying tickers and their OHLC
+            DataFrames.
+            commodities : Dict, optional
+                Dictionary of commodity tickers in portfolio.
+            stocks : Dict, optional
+                Dictionary of stock tickers in portfolio.
+            fx : Dict, optional
+                Dictionary of fx tickers in portfolio.
+            crypto : Dict, optional
+                Dictionary of crypto tickers in portfolio.
+
+        keep_columns : List, optional
+            The columns of each tickers prices table to store, as float32
+            where they are floating point. If None, all columns are kept. The
+            default is the close, equity, position, trade number and pnl
+            columns.
+
+        verbose : Bool, optional
+            Whether to print each market and ticker as it is tested. The
+            default is True.
+
+        **kwargs : Dict
+            All other keyword parameter.
+
+        Returns
+        -------
+        system_dict : Dict
+            Dictionary containing returns data for each underlying.
+
+        """
+        system_dict = {}
+        keep_columns = kwargs.pop('keep_columns', _PORTFOLIO_PRICE_COLUMNS)
+        verbose = kwargs.pop('verbose', True)
+        start_date = kwargs.get('start_date', None)
+        end_date = kwargs.get('end_date', None)
+        source_by_market = _source_by_market(
+            kwargs.get('equity_source', 'yahoo'))
+
+        # Trim each tickers data to the backtest dates and resolve the
+        # data source
+        price_dict = {}
+        ticker_sources = {}
+        for market, underlying_dict in portfolio.items():
+            ticker_source = source_by_market.get(market, 'alpha')
+            for ticker, market_data in underlying_dict.items():
+                price_dict[ticker] = Markets.trim_dates(
+                    prices=market_data, start_date=start_date,
+                    end_date=end_date)
+                ticker_sources[ticker] = ticker_source
+
+        # Find the moving average periods used by the entry strategy
+        params = Setup.init_params(kwargs)
+        num_mas = {'2ma':2, '3ma':3, '4ma':4}.get(params['entry_type'], 0)
+        if not params['simple_ma']:
+            num_mas = 0
+        periods = sorted({int(params['ma'+str(num)])
+                          for num in range(1, num_mas + 1)})
+
+        # Calculate the moving averages for every ticker at once. The closes
+        # are stacked by ticker and date, rather than aligned on a common
+        # date index, so that different trading calendars don't introduce
+        # gaps into the rolling windows.
+        indicators = pd.DataFrame()
+        if price_dict and periods:
+            closes = pd.concat(
+                {ticker: prices['Close']
+                 for ticker, prices in price_dict.items()},
+                names=['ticker', 'date'])
+            grouped_closes = closes.groupby(level='ticker', sort=False)
+            indicators = pd.DataFrame({
+                'sma_'+str(period): grouped_closes.rolling(
+                    period).mean().droplevel(0)
+                for period in periods})
+
+        for ticker, ticker_source in ticker_sources.items():
+            if verbose:
+                print(ticker)
+            prices = price_dict[ticker]
+            if not indicators.empty:
+                ticker_indicators = indicators.xs(ticker, level='ticker')
+                ticker_indicators.index = prices.index
+                prices = pd.concat([prices, ticker_indicators], axis=1)
+
+            strat_kwargs = dict(kwargs)
+            strat_kwargs.update({
+                'ticker':ticker,
+                'ticker_source':ticker_source,
+                'input_data':'set',
+                'tables':{'prices':prices},
+                'start_date':str(prices.index[0].date()),
+                'end_date':str(prices.index[-1].date()),
+                'generate_signals':False,
+                'compute_perf_report':False})
+            strat = TestStrategy(**strat_kwargs)
+
+            system_dict[ticker] = _portfolio_entry(
+                params=strat.backtest_params, tables=strat.tables,
+                keep_columns=keep_columns)
+
+            if start_date is None:
+                start_date = strat.backtest_params['start_date']
+            if end_date is None:
+                end_date = strat.backtest_params['end_date']
 
         params = {}
         params['start_date'] = start_date
@@ -451,7 +1042,7 @@ class TestPortfolio():
         """
         #input_list = data.top_trends['top_ticker_list'][:num_tickers]
         input_list = top_ticker_list[:num_tickers]
-        portfolio.update({asset_class:list(zip(*input_list))[0]})
+        portfolio.update({asset_class:tuple(pair[0] for pair in input_list)})
 
         return portfolio
 
@@ -483,11 +1074,11 @@ class TestPortfolio():
             Dictionary to contain asset classes and ticker lists..
 
         """
-        input_dict = {}
+        # The dictionary is keyed on rank in order so only the first
+        # num_tickers entries are needed
         #for rank, pair in data.top_trends['top_ticker_dict'].items():
-        for rank, pair in top_ticker_dict.items():
-            if rank < num_tickers:
-                input_dict[pair[0]] = pair[1]
+        input_dict = {pair[0]: pair[1] for _, pair in itertools.islice(
+            top_ticker_dict.items(), num_tickers)}
         portfolio.update({asset_class:input_dict})
 
         return portfolio
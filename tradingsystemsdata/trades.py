@@ -5,6 +5,7 @@ Calculate trades data
 
 import pandas as pd
 import numpy as np
+from tradingsystemsdata._njit import kernel
 
 class Trades():
     """
@@ -14,7 +15,7 @@ class Trades():
     @staticmethod
     def trade_numbers(
         prices: pd.DataFrame,
-        end_of_day_position: pd.Series,
+        end_of_day_position: pd.Series | np.ndarray,
         start: int) -> np.ndarray:
         """
         Calculate the trade numbers
@@ -23,7 +24,7 @@ class Trades():
         ----------
         prices : DataFrame
             The OHLC data.
-        end_of_day_position : Series
+        end_of_day_position : Series or ndarray
             The number of units of position held at the end of day.
         start : Int
             The first valid row to start calculating trade information from.
@@ -34,49 +35,63 @@ class Trades():
             Array of trade numbers.
 
         """
-        # Extract the end of day position from the OHLC Data
-        eod_pos_np = np.array(end_of_day_position)
-
-        # Create numpy array of zeros to store trade numbers
-        trade_number = np.array([0]*len(prices))
-
-        # Set initial trade count to zero
-        trade_count = 0
+        # Extract the end of day position from the OHLC Data, only copying if
+        # it isn't already a writeable float64 array
+        eod_pos_np = np.require(
+            end_of_day_position, dtype=np.float64, requirements=['C', 'W'])
 
-        # For each valid row in the data
-        for row in range(start, len(prices)):
+        # The trade numbers are mapped back to the OHLC data so the position
+        # must match its length
+        if len(eod_pos_np) != len(prices):
+            raise ValueError(
+                "The end of day position must be the same length as prices")
 
-            # If today's position is zero
-            if eod_pos_np[row] == 0:
+        # Number each trade from the first valid row
+        trade_number = _trade_numbers_loop(eod_pos_np, int(start))
 
-                # If yesterday's position is zero
-                if eod_pos_np[row - 1] == 0:
-
-                    # There is no open trade so set trade number to zero
-                    trade_number[row] = 0
-
-                # If yesterday's position is not zero
-                else:
+        return trade_number
 
-                    # Set the trade number to the current trade count
-                    trade_number[row] = trade_count
 
-            # If today's position is the same as yesterday
-            elif eod_pos_np[row] == eod_pos_np[row - 1]:
+    @staticmethod
+    def scale_positions_and_number_trades(
+        pos_dict: dict,
+        position_size: pd.Series,
+        start: int) -> dict:
+        """
+        Scale raw positions by position size and calculate the trade numbers
+        of the scaled positions in a single pass.
 
-                # Set the trade number to yesterdays trade number
-                trade_number[row] = trade_number[row - 1]
+        Parameters
+        ----------
+        pos_dict : Dict
+            Dictionary of start of day, end of day positions and trade actions.
+        position_size : Series
+            Array of the position size to be applied each day.
+        start : Int
+            The first valid row to start calculating trade information from.
 
-            # If today's position is non-zero and different from yesterday
-            else:
+        Returns
+        -------
+        scaled_pos_dict : Dict
+            Dictionary of the 3 position arrays, scaled by the position sizes,
+            and the array of trade numbers.
 
-                # Increase trade count by one for a new trade
-                trade_count += 1
+        """
+        start_of_day_position, trade_action, end_of_day_position, \
+            trade_number = _scale_map_tradenum(
+                np.array(pos_dict['start_of_day_position'], dtype=np.float64),
+                np.array(pos_dict['trade_action'], dtype=np.float64),
+                np.array(pos_dict['end_of_day_position'], dtype=np.float64),
+                np.array(position_size, dtype=np.float64),
+                int(start))
 
-                # Set the trade number to the current trade count
-                trade_number[row] = trade_count
+        scaled_pos_dict = {}
+        scaled_pos_dict['start_of_day_position'] = start_of_day_position
+        scaled_pos_dict['trade_action'] = trade_action
+        scaled_pos_dict['end_of_day_position'] = end_of_day_position
+        scaled_pos_dict['trade_number'] = trade_number
 
-        return trade_number
+        return scaled_pos_dict
 
 
     @staticmethod
@@ -305,3 +320,110 @@ class Trades():
                         combined_signal[row] = 0
 
         return combined_signal
+
+
+@kernel('i8[:](f8[:], i8)')
+def _trade_numbers_loop(
+    eod_pos_np: np.ndarray,
+    start: int) -> np.ndarray:
+
+    # Create numpy array of zeros to store trade numbers
+    trade_number = np.zeros(len(eod_pos_np), dtype=np.int64)
+
+    # Set initial trade count to zero
+    trade_count = 0
+
+    # For each valid row in the data
+    for row in range(start, len(eod_pos_np)):
+
+        # If today's position is zero
+        if eod_pos_np[row] == 0:
+
+            # If yesterday's position is zero
+            if eod_pos_np[row - 1] == 0:
+
+                # There is no open trade so set trade number to zero
+                trade_number[row] = 0
+
+            # If yesterday's position is not zero
+            else:
+
+                # Set the trade number to the current trade count
+                trade_number[row] = trade_count
+
+        # If today's position is the same as yesterday
+        elif eod_pos_np[row] == eod_pos_np[row - 1]:
+
+            # Set the trade number to yesterdays trade number
+            trade_number[row] = trade_number[row - 1]
+
+        # If today's position is non-zero and different from yesterday
+        else:
+
+            # Increase trade count by one for a new trade
+            trade_count += 1
+
+            # Set the trade number to the current trade count
+            trade_number[row] = trade_count
+
+    return trade_number
+
+
+@kernel('UniTuple(i8[:], 4)(f8[:], f8[:], f8[:], f8[:], i8)')
+def _scale_map_tradenum(
+    sod: np.ndarray,
+    tact: np.ndarray,
+    eod: np.ndarray,
+    pos_size: np.ndarray,
+    start: int) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+
+    # Create arrays of zeros to store the scaled positions and trade numbers
+    start_of_day_position = np.zeros(len(sod), dtype=np.int64)
+    trade_action = np.zeros(len(sod), dtype=np.int64)
+    end_of_day_position = np.zeros(len(sod), dtype=np.int64)
+    trade_number = np.zeros(len(sod), dtype=np.int64)
+
+    # Set initial trade count to zero
+    trade_count = 0
+
+    # The first row is always flat so has no trade number
+    for row in range(1, len(sod)):
+
+        # Scale the position info by the position size
+        start_of_day_position[row] = int(sod[row] * pos_size[row-1])
+        if tact[row] != 0:
+            trade_action[row] = int(
+                (-eod[row-1] * pos_size[row-1]) + (
+                    (tact[row] + eod[row-1]) * pos_size[row]))
+        end_of_day_position[row] = (
+            start_of_day_position[row] + trade_action[row])
+
+        # Only number trades from the first valid row
+        if row < start:
+            continue
+
+        # If today's position is zero
+        if end_of_day_position[row] == 0:
+
+            # If yesterday's position is not zero set the trade number to the
+            # current trade count, otherwise there is no open trade
+            if end_of_day_position[row - 1] != 0:
+                trade_number[row] = trade_count
+
+        # If today's position is the same as yesterday
+        elif end_of_day_position[row] == end_of_day_position[row - 1]:
+
+            # Set the trade number to yesterdays trade number
+            trade_number[row] = trade_number[row - 1]
+
+        # If today's position is non-zero and different from yesterday
+        else:
+
+            # Increase trade count by one for a new trade
+            trade_count += 1
+
+            # Set the trade number to the current trade count
+            trade_number[row] = trade_count
+
+    return start_of_day_position, trade_action, end_of_day_position, \
+        trade_number
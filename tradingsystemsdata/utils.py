@@ -2,7 +2,7 @@
 Utility functions
 
 """
-import copy
+from collections import OrderedDict
 import datetime as dt
 import numpy as np
 import pandas as pd
@@ -10,6 +10,11 @@ from pandas.tseries.offsets import BDay
 from tradingsystemsdata.systems_params import system_params_dict
 from tradingsystemsdata.marketdata import Markets, NorgateFunctions
 
+# Downloaded OHLC data, keyed on ticker, source and date range, so that
+# repeated backtests of the same ticker don't refetch identical data
+_PRICE_CACHE = OrderedDict()
+_PRICE_CACHE_SIZE = 256
+
 class Setup():
     """
     Methods to initialise system
@@ -30,8 +35,13 @@ class Setup():
             Dictionary of parameters.
 
         """
-        # Copy the default parameters
-        params = copy.deepcopy(system_params_dict['df_params'])
+        # Copy the default parameters. The only mutable value is the
+        # dictionary of contract months, so copy that explicitly rather than
+        # using a deepcopy
+        df_params = system_params_dict['df_params']
+        params = {
+            **df_params,
+            'contract_months': dict(df_params['contract_months'])}
 
         # Extract the entry, exit and stop signal dictionaries
         entry_signal_dict = system_params_dict['df_entry_signal_dict']
@@ -140,8 +150,9 @@ class Setup():
         return params
 
 
-    @staticmethod
+    @classmethod
     def _prepare_ticker_data(
+        cls,
         params: dict,
         tables: dict,
         market_data: pd.DataFrame | None = None) -> tuple[dict, dict]:
@@ -150,13 +161,21 @@ class Setup():
             # Reset the prices and benchmark tables to the source data
             tables, params = Markets.reset_data(tables, params)
 
-        elif params['input_data'] == 'set':
-            tables['prices'] = market_data
-
         else:
-            tables['prices'], params = Markets.create_base_data(
-                ticker=params['ticker'], source=params['ticker_source'],
-                params=params, benchmark_flag=False)
+            if params['input_data'] == 'set':
+                # Use the data supplied, either directly or in the prices
+                # table passed in
+                if market_data is not None:
+                    tables['prices'] = market_data
+
+                # There is no download to supply the longname so use the
+                # ticker unless one was passed in
+                params.setdefault('longname', params['ticker'])
+
+            else:
+                tables['prices'], params = cls.cached_base_data(
+                    ticker=params['ticker'], source=params['ticker_source'],
+                    params=params, benchmark_flag=False)
 
             if params['ticker'][0] == '&':
                 params = NorgateFunctions.contract_data(
@@ -168,25 +187,100 @@ class Setup():
         return params, tables
 
 
-    @staticmethod
+    @classmethod
     def _prepare_benchmark_data(
+        cls,
         params: dict,
         tables: dict) -> tuple[dict, dict]:
 
         # Extract benchmark data for Beta calculation
         print("Ticker source: ", params['ticker_source'])
         if params['ticker_source'] == 'norgate':
-            tables['benchmark'], params = Markets.create_base_data(
+            tables['benchmark'], params = cls.cached_base_data(
                 ticker=params['norgate_bench_ticker'], source=params['bench_source'],
                 params=params, benchmark_flag=True)
         else:
-            tables['benchmark'], params = Markets.create_base_data(
+            tables['benchmark'], params = cls.cached_base_data(
                 ticker=params['yahoo_bench_ticker'], source='yahoo',
                 params=params, benchmark_flag=True)
 
         return params, tables
 
 
+    @staticmethod
+    def cached_base_data(
+        ticker: str,
+        source: str,
+        params: dict,
+        benchmark_flag: bool) -> tuple[pd.DataFrame, dict]:
+        """
+        Create DataFrame of OHLC prices, reusing previously downloaded data
+        for the same ticker, source and date range.
+
+        Parameters
+        ----------
+        ticker : Str
+            Underlying to return.
+        source : Str
+            The data source to use, either 'norgate', 'yahoo' or 'alpha'.
+        params : Dict
+            Dictionary of parameters.
+        benchmark_flag : Bool
+            Whether the data is for the benchmark.
+
+        Returns
+        -------
+        prices : DataFrame
+            Returns a copy of the OHLC DataFrame.
+        params : Dict
+            Dictionary of parameters.
+
+        """
+        key = (ticker, source, params['start_date'], params['end_date'],
+               benchmark_flag, params['asset_type'], params['ccy_1'],
+               params['ccy_2'])
+
+        if key in _PRICE_CACHE:
+            _PRICE_CACHE.move_to_end(key)
+            prices, param_updates = _PRICE_CACHE[key]
+
+        else:
+            initial_params = dict(params)
+            prices, params = Markets.create_base_data(
+                ticker=ticker, source=source, params=params,
+                benchmark_flag=benchmark_flag)
+
+            # Store any parameters set by the download, e.g. the longname.
+            # Values are compared by identity as they may be DataFrames, so
+            # any value the download replaced is stored even if it is equal.
+            param_updates = {
+                name: value for name, value in params.items()
+                if (name not in initial_params
+                    or initial_params[name] is not value)}
+
+            _PRICE_CACHE[key] = (prices, param_updates)
+            if len(_PRICE_CACHE) > _PRICE_CACHE_SIZE:
+                _PRICE_CACHE.popitem(last=False)
+
+        params.update(param_updates)
+
+        # Downstream calculations add columns in place so hand out a copy
+        return prices.copy(), params
+
+
+    @staticmethod
+    def clear_price_cache() -> None:
+        """
+        Remove all stored OHLC data so that it is downloaded again.
+
+        Returns
+        -------
+        None.
+
+        """
+        _PRICE_CACHE.clear()
+
+
 class Labels():
     """
     Create labels for the Entry, Exit and Stop Strategies.
@@ -669,11 +763,47 @@ class Reformat():
             The OHLC data.
 
         """
-        # For each key, value combination in the input dictionary
-        for key, value in input_dict.items():
+        # Add the arrays to the OHLC DataFrame appending the title modifier
+        # to the beginning of each name
+        prices = Reformat.add_columns(
+            prices=prices,
+            column_dict={
+                title_modifier+key: value for key, value in input_dict.items()})
+
+        return prices
+
+
+    @staticmethod
+    def add_columns(
+        prices: pd.DataFrame,
+        column_dict: dict) -> pd.DataFrame:
+        """
+        Add a dictionary of arrays to the OHLC data in a single operation
+        rather than inserting each column separately.
+
+        Parameters
+        ----------
+        prices : DataFrame
+            The OHLC data.
+        column_dict : Dict
+            Dictionary of arrays keyed on column name.
+
+        Returns
+        -------
+        prices : DataFrame
+            The OHLC data with the additional columns.
+
+        """
+        new_columns = pd.DataFrame(column_dict, index=prices.index)
+
+        # Overwrite any columns that are already present in place
+        existing = new_columns.columns.intersection(prices.columns)
+        if len(existing) > 0:
+            prices[existing] = new_columns[existing]
+            new_columns = new_columns.drop(columns=existing)
 
-            # Add the array to the OHLC DataFrame appending the title modifier
-            # to the beginning of the name
-            prices[title_modifier+key] = value
+        # Append the remaining columns in one block
+        if len(new_columns.columns) > 0:
+            prices = pd.concat([prices, new_columns], axis=1)
 
         return prices